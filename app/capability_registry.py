@@ -2,39 +2,51 @@
 
 from __future__ import annotations
 
+import mmap
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 import yaml
-from pydantic import BaseModel, Field, ValidationError
 
 from app.config import BASE_DIR, logger
 from app.product_scope import ProductScope
 
 REGISTRY_FILE: Path = BASE_DIR / "app" / "CAPABILITIES.yaml"
+# Por encima de este tamano se mapea el archivo en memoria en vez de copiarlo.
+_MMAP_THRESHOLD_BYTES: int = 64 * 1024
 
+# LibYAML (C) es mucho mas rapido; si no esta compilado usamos el loader puro.
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
 
-class JsonSchema(BaseModel):
+
+@dataclass(slots=True)
+class JsonSchema:
     """Simple JSON schema representation for auditability."""
 
     type: str = "object"
-    required: list[str] = Field(default_factory=list)
-    properties: dict[str, Any] = Field(default_factory=dict)
+    required: list[str] = field(default_factory=list)
+    properties: dict[str, Any] = field(default_factory=dict)
 
 
-class CapabilityDefinition(BaseModel):
+@dataclass(slots=True)
+class CapabilityDefinition:
     """Single capability definition entry."""
 
     id: str
-    phase: int = Field(ge=1)
+    phase: int
     provider: str
     summary: str
     input_schema: JsonSchema
     output_schema: JsonSchema
-    fallback_to: list[str] = Field(default_factory=list)
+    fallback_to: list[str] = field(default_factory=list)
 
 
-class CapabilityRegistryFile(BaseModel):
+@dataclass(slots=True)
+class CapabilityRegistryFile:
     """Top-level file model."""
 
     version: int
@@ -42,6 +54,90 @@ class CapabilityRegistryFile(BaseModel):
     capabilities: list[CapabilityDefinition]
 
 
+class RegistryFormatError(ValueError):
+    """Raised when CAPABILITIES.yaml does not match the expected shape."""
+
+
+def _require(raw: dict[str, Any], key: str, expected: type, where: str) -> Any:
+    if key not in raw:
+        raise RegistryFormatError(f"{where}.{key}: campo requerido")
+    value = raw[key]
+    # bool es subclase de int; no lo aceptamos como entero.
+    if not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+        raise RegistryFormatError(f"{where}.{key}: se esperaba {expected.__name__}")
+    return value
+
+
+def _optional(raw: dict[str, Any], key: str, expected: type, where: str, default: Any) -> Any:
+    if key not in raw:
+        return default
+    return _require(raw, key, expected, where)
+
+
+def _parse_str_list(values: list[Any], where: str) -> list[str]:
+    if not all(isinstance(item, str) for item in values):
+        raise RegistryFormatError(f"{where}: se esperaba lista de strings")
+    return list(values)
+
+
+def _parse_schema(raw: Any, where: str) -> JsonSchema:
+    if not isinstance(raw, dict):
+        raise RegistryFormatError(f"{where}: se esperaba objeto")
+    return JsonSchema(
+        type=_optional(raw, "type", str, where, "object"),
+        required=_parse_str_list(_optional(raw, "required", list, where, []), f"{where}.required"),
+        properties=dict(_optional(raw, "properties", dict, where, {})),
+    )
+
+
+def _parse_capability(raw: Any, where: str) -> CapabilityDefinition:
+    if not isinstance(raw, dict):
+        raise RegistryFormatError(f"{where}: se esperaba objeto")
+    phase = _require(raw, "phase", int, where)
+    if phase < 1:
+        raise RegistryFormatError(f"{where}.phase: debe ser >= 1")
+    return CapabilityDefinition(
+        id=_require(raw, "id", str, where),
+        phase=phase,
+        provider=_require(raw, "provider", str, where),
+        summary=_require(raw, "summary", str, where),
+        input_schema=_parse_schema(_require(raw, "input_schema", dict, where), f"{where}.input_schema"),
+        output_schema=_parse_schema(_require(raw, "output_schema", dict, where), f"{where}.output_schema"),
+        fallback_to=_parse_str_list(_optional(raw, "fallback_to", list, where, []), f"{where}.fallback_to"),
+    )
+
+
+def _parse_registry(data: Any) -> CapabilityRegistryFile:
+    """Builds the registry from trusted YAML with cheap shape checks (no pydantic)."""
+    if not isinstance(data, dict):
+        raise RegistryFormatError("raiz: se esperaba objeto")
+    raw_capabilities = _require(data, "capabilities", list, "raiz")
+    return CapabilityRegistryFile(
+        version=_require(data, "version", int, "raiz"),
+        updated_at=_require(data, "updated_at", str, "raiz"),
+        capabilities=[
+            _parse_capability(raw, f"capabilities[{index}]")
+            for index, raw in enumerate(raw_capabilities)
+        ],
+    )
+
+
+def _load_yaml_file(path: Path, size: int) -> Any:
+    """Parses a YAML file, memory-mapping it when it is large enough to matter."""
+    if size < _MMAP_THRESHOLD_BYTES:
+        return yaml.load(path.read_bytes(), Loader=_YamlLoader)
+    with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return yaml.load(mapped, Loader=_YamlLoader)
+
+
+def _allow_all(_capability_id: str) -> bool:
+    return True
+
+
+# Cache de parseo: (ruta, mtime_ns, size) -> registro ya validado.
+_PARSE_CACHE: dict[tuple[str, int, int], CapabilityRegistryFile] = {}
+
+
 class CapabilityRegistry:
     """Runtime capability registry with scope filtering and fallback chains."""
 
@@ -55,30 +151,54 @@ class CapabilityRegistry:
         self.version: int = 0
         self.updated_at: str = ""
         self._capabilities: dict[str, CapabilityDefinition] = {}
+        self._chains: dict[str, tuple[str, ...]] = {}
+        self._registry_ids: frozenset[str] = frozenset()
+        # Predicado de scope resuelto una sola vez; evita el chequeo de None por llamada.
+        self._is_allowed: Callable[[str], bool] = (
+            product_scope.is_allowed if product_scope else _allow_all
+        )
         self.reload()
 
+    def _clear(self) -> None:
+        self._capabilities = {}
+        self._chains = {}
+        self._registry_ids = frozenset()
+
     def reload(self) -> None:
         """Reload capability registry from disk and validate shape."""
         if not self.path.exists():
-            logger.warning(f"CAPABILITIES registry no encontrado: {self.path}")
-            self._capabilities = {}
+            logger.warning("CAPABILITIES registry no encontrado: %s", self.path)
+            self._clear()
             return
 
-        data = yaml.safe_load(self.path.read_text(encoding="utf-8")) or {}
-        if "updated_at" in data:
-            data["updated_at"] = str(data["updated_at"])
-        try:
-            parsed = CapabilityRegistryFile.model_validate(data)
-        except ValidationError as exc:
-            logger.error(f"CAPABILITIES.yaml invalido: {exc}")
-            self._capabilities = {}
+        stat = self.path.stat()
+        if stat.st_size == 0:
+            logger.warning("CAPABILITIES registry vacio: %s", self.path)
+            self._clear()
             return
 
+        cache_key = (str(self.path), stat.st_mtime_ns, stat.st_size)
+        parsed = _PARSE_CACHE.get(cache_key)
+        if parsed is None:
+            data = _load_yaml_file(self.path, stat.st_size)
+            if isinstance(data, dict) and "updated_at" in data:
+                data["updated_at"] = str(data["updated_at"])
+            try:
+                parsed = _parse_registry(data)
+            except RegistryFormatError as exc:
+                logger.error("CAPABILITIES.yaml invalido: %s", exc)
+                self._clear()
+                return
+            # Solo conservamos la version vigente de cada archivo.
+            for stale_key in [key for key in _PARSE_CACHE if key[0] == cache_key[0]]:
+                del _PARSE_CACHE[stale_key]
+            _PARSE_CACHE[cache_key] = parsed
+
         ids_seen: set[str] = set()
         capabilities: dict[str, CapabilityDefinition] = {}
         for capability in parsed.capabilities:
             if capability.id in ids_seen:
-                logger.warning(f"Capability duplicada ignorada: {capability.id}")
+                logger.warning("Capability duplicada ignorada: %s", capability.id)
                 continue
             ids_seen.add(capability.id)
             capabilities[capability.id] = capability
@@ -86,32 +206,35 @@ class CapabilityRegistry:
         self.version = parsed.version
         self.updated_at = parsed.updated_at
         self._capabilities = capabilities
-        logger.info(f"CapabilityRegistry cargado con {len(self._capabilities)} capacidades.")
+        self._registry_ids = frozenset(capabilities)
+        self._chains = {
+            capability_id: self._build_chain(capability_id)
+            for capability_id in capabilities
+            if self._is_allowed(capability_id)
+        }
+        logger.info("CapabilityRegistry cargado con %d capacidades.", len(self._capabilities))
 
     def get(self, capability_id: str) -> CapabilityDefinition | None:
         """Gets a capability by id."""
         capability = self._capabilities.get(capability_id)
-        if not capability:
-            return None
-        if self.product_scope and not self.product_scope.is_allowed(capability_id):
-            return None
-        return capability
+        return capability if capability is not None and self._is_allowed(capability_id) else None
 
     def all_ids(self) -> list[str]:
         """Returns allowed capability ids respecting product scope."""
-        if not self.product_scope:
-            return list(self._capabilities.keys())
-        return [
-            capability_id
-            for capability_id in self._capabilities
-            if self.product_scope.is_allowed(capability_id)
-        ]
+        is_allowed = self._is_allowed
+        if is_allowed is _allow_all:
+            return list(self._capabilities)
+        return [capability_id for capability_id in self._capabilities if is_allowed(capability_id)]
 
     def resolve_chain(self, primary_capability: str) -> list[str]:
-        """Builds primary + fallback chain, filtered by scope and registry presence."""
+        """Returns primary + fallback chain, filtered by scope and registry presence."""
+        return list(self._chains.get(primary_capability, ()))
+
+    def _build_chain(self, primary_capability: str) -> tuple[str, ...]:
+        """Builds primary + fallback chain; precomputed on every reload."""
         first = self.get(primary_capability)
         if not first:
-            return []
+            return ()
 
         chain: list[str] = [primary_capability]
         seen: set[str] = {primary_capability}
@@ -121,13 +244,12 @@ class CapabilityRegistry:
             if self.get(fallback_id):
                 chain.append(fallback_id)
                 seen.add(fallback_id)
-        return chain
+        return tuple(chain)
 
-    def ensure_scope_consistency(self) -> tuple[set[str], set[str]]:
+    def ensure_scope_consistency(self) -> tuple[set[str], frozenset[str]]:
         """Returns (in_scope_not_in_registry, in_registry_not_in_scope)."""
         if not self.product_scope:
-            return set(), set()
+            return set(), frozenset()
 
-        registry_ids = set(self._capabilities.keys())
-        scope_ids = set(self.product_scope.capabilities)
-        return scope_ids - registry_ids, registry_ids - scope_ids
+        scope_ids = self.product_scope.capabilities
+        return scope_ids - self._registry_ids, self._registry_ids - scope_ids
@@ -41,6 +41,15 @@ EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "nomic-embed-text")
 OLLAMA_TIMEOUT: int = int(os.getenv("OLLAMA_TIMEOUT", "120"))
 _OLLAMA_THINK_RAW: str = os.getenv("OLLAMA_THINK", "false")
 OLLAMA_THINK, OLLAMA_THINK_LEVEL = _parse_ollama_think(_OLLAMA_THINK_RAW)
+# Opciones de inferencia enviadas en cada request (0 = usar el default del servidor/modelo).
+# num_ctx fijo: cambiarlo entre requests obliga a Ollama a recargar el modelo.
+OLLAMA_NUM_CTX: int = int(os.getenv("OLLAMA_NUM_CTX", "0"))
+OLLAMA_NUM_BATCH: int = int(os.getenv("OLLAMA_NUM_BATCH", "0"))
+OLLAMA_NUM_PREDICT: int = int(os.getenv("OLLAMA_NUM_PREDICT", "0"))
+# Tiempo que Ollama mantiene el modelo cargado tras cada request (ej: 30m, 1h, -1 = siempre).
+OLLAMA_KEEP_ALIVE: str = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+# Debe coincidir con OLLAMA_NUM_PARALLEL del servidor Ollama (slots de inferencia en paralelo).
+OLLAMA_NUM_PARALLEL: int = max(1, int(os.getenv("OLLAMA_NUM_PARALLEL", "4")))
 
 # --- ChromaDB ---
 CHROMA_DIR: str = str(DATA_DIR / "chromadb")
@@ -63,12 +72,21 @@ RADARR_API_KEY: str = os.getenv("RADARR_API_KEY", "")
 HOST: str = os.getenv("HOST", "0.0.0.0")
 PORT: int = int(os.getenv("PORT", "8000"))
 RELOAD: bool = os.getenv("RELOAD", "false").strip().lower() in {"1", "true", "yes", "on"}
+# Cada worker es un proceso con su propio historial, bot de Telegram y scheduler;
+# subirlo duplica polling y recordatorios. Con RELOAD activo se fuerza a 1.
+WORKERS: int = max(1, int(os.getenv("WORKERS", "1")))
+LIMIT_CONCURRENCY: int = int(os.getenv("LIMIT_CONCURRENCY", "1000"))
+TIMEOUT_KEEP_ALIVE: int = int(os.getenv("TIMEOUT_KEEP_ALIVE", "30"))
+# Segundos que /health reutiliza su ultimo resultado (0 = sondear siempre).
+HEALTH_CACHE_TTL: float = max(0.0, float(os.getenv("HEALTH_CACHE_TTL", "5")))
 
 # --- Personalidad ---
 PERSONALITY_FILE: Path = Path(__file__).resolve().parent / "personality.yaml"
 
 # --- Logging ---
 LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+# Log de latencia/tokens por request a Ollama (prefill, decode, tok/s).
+LOG_LATENCY: bool = os.getenv("LOG_LATENCY", "false").strip().lower() in {"1", "true", "yes", "on"}
 LOG_FILE: Path = LOG_DIR / "agent.log"
 
 
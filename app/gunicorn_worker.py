@@ -0,0 +1,22 @@
+"""
+Worker de Gunicorn para produccion (ver gunicorn.conf.py).
+
+UvicornWorker solo traslada a uvicorn los settings propios de Gunicorn
+(keepalive, max_requests, ...); `worker_connections` no aplica a este worker,
+asi que LIMIT_CONCURRENCY se pasa directo a la Config de uvicorn.
+"""
+
+from typing import Any
+
+from uvicorn_worker import UvicornWorker
+
+from app.config import LIMIT_CONCURRENCY
+
+
+class ShaggyUvicornWorker(UvicornWorker):
+    """UvicornWorker con el limite de concurrencia del proyecto."""
+
+    CONFIG_KWARGS: dict[str, Any] = {
+        **UvicornWorker.CONFIG_KWARGS,
+        "limit_concurrency": LIMIT_CONCURRENCY,
+    }
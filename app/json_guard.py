@@ -5,12 +5,24 @@ from __future__ import annotations
 import json
 import re
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Any, TypeVar
 
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+# orjson es bastante mas rapido que json stdlib; si no esta instalado usamos stdlib.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
 T = TypeVar("T", bound=BaseModel)
 
+# Prefijo ```json y sufijo ``` en una sola pasada.
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+_JSON_STRUCTURAL_RE = re.compile(r'[{}"\\]')
+
 
 @dataclass
 class JsonGuardTrace:
@@ -23,8 +35,7 @@ class JsonGuardTrace:
 def _strip_fences(text: str) -> str:
     """Removes markdown fences around JSON."""
     cleaned = (text or "").strip()
-    cleaned = re.sub(r"^```(?:json)?\s*", "", cleaned, flags=re.IGNORECASE)
-    cleaned = re.sub(r"\s*```$", "", cleaned)
+    cleaned = _FENCE_RE.sub("", cleaned)
     return cleaned.strip()
 
 
@@ -37,19 +48,27 @@ def _extract_first_json_object(text: str) -> str:
     if cleaned.startswith("{") and cleaned.endswith("}"):
         return cleaned
 
-    start = cleaned.find("{")
+    start, end = _find_json_object_span(cleaned)
+    return cleaned[start:end] if start >= 0 else ""
+
+
+def _find_json_object_span(text: str) -> tuple[int, int]:
+    """Returns (start, end) offsets of the first balanced object, or (-1, -1)."""
+    start = text.find("{")
     if start < 0:
-        return ""
+        return -1, -1
 
+    # Solo visitamos caracteres estructurales; el resto se salta a nivel C.
     depth = 0
     in_string = False
-    escaped = False
-    for idx, char in enumerate(cleaned[start:], start=start):
-        if escaped:
-            escaped = False
+    escaped_idx = -1
+    for match in _JSON_STRUCTURAL_RE.finditer(text, start):
+        idx = match.start()
+        if idx == escaped_idx:
             continue
+        char = match.group()
         if char == "\\":
-            escaped = True
+            escaped_idx = idx + 1
             continue
         if char == '"':
             in_string = not in_string
@@ -58,32 +77,37 @@ def _extract_first_json_object(text: str) -> str:
             continue
         if char == "{":
             depth += 1
-        elif char == "}":
+        else:
             depth -= 1
             if depth == 0:
-                return cleaned[start : idx + 1]
-    return ""
-
+                return start, idx + 1
+    return -1, -1
 
-def _local_json_repair(raw: str) -> str:
-    """Applies cheap local repairs before asking model to regenerate."""
-    candidate = _extract_first_json_object(raw)
-    if not candidate:
-        candidate = _strip_fences(raw)
 
+def _local_json_repair(candidate: str) -> str:
+    """Applies cheap local repairs to an extracted candidate before asking model to regenerate."""
     # Remove trailing commas in objects/arrays.
-    candidate = re.sub(r",\s*([}\]])", r"\1", candidate)
-    return candidate.strip()
+    return _TRAILING_COMMA_RE.sub(r"\1", candidate).strip()
 
 
-def validate_json_output(raw: str, schema_model: type[T]) -> T:
-    """Parses raw output and validates against a Pydantic model."""
-    candidate = _extract_first_json_object(raw)
+@lru_cache(maxsize=64)
+def _schema_adapter(schema_model: type[BaseModel]) -> TypeAdapter:
+    """Reuses one TypeAdapter per schema across calls."""
+    return TypeAdapter(schema_model)
+
+
+def _validate_candidate(candidate: str, schema_model: type[T]) -> T:
+    """Parses an already-extracted JSON candidate and validates it."""
     if not candidate:
         raise ValueError("No se encontro objeto JSON en la salida.")
 
-    data = json.loads(candidate)
-    return schema_model.model_validate(data)
+    data = _json_loads(candidate)
+    return _schema_adapter(schema_model).validate_python(data)
+
+
+def validate_json_output(raw: str, schema_model: type[T]) -> T:
+    """Parses raw output and validates against a Pydantic model."""
+    return _validate_candidate(_extract_first_json_object(raw), schema_model)
 
 
 async def generate_validated_json(
@@ -116,10 +140,17 @@ async def generate_validated_json(
         )
         trace.outputs.append(raw)
 
-        for candidate in (raw, _local_json_repair(raw)):
+        # Extraemos una sola vez; la reparacion trabaja sobre el candidato ya aislado.
+        candidate = _extract_first_json_object(raw)
+        try:
+            return _validate_candidate(candidate, schema_model), trace
+        except (ValueError, json.JSONDecodeError, ValidationError) as exc:
+            trace.last_error = str(exc)
+
+        repaired = _local_json_repair(candidate)
+        if repaired != candidate:
             try:
-                parsed = validate_json_output(candidate, schema_model)
-                return parsed, trace
+                return _validate_candidate(repaired, schema_model), trace
             except (ValueError, json.JSONDecodeError, ValidationError) as exc:
                 trace.last_error = str(exc)
 
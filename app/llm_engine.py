@@ -4,23 +4,279 @@ Clase OllamaEngine que conecta al API local de Ollama para generar respuestas.
 """
 
 import asyncio
-import re
-from typing import Any, Optional
+import time
+from functools import lru_cache
+from typing import Any, AsyncIterator, Optional, Sequence
 
 import httpx
 
 from app.config import (
+    LOG_LATENCY,
+    OLLAMA_KEEP_ALIVE,
     OLLAMA_URL,
     OLLAMA_MODEL,
+    OLLAMA_NUM_BATCH,
+    OLLAMA_NUM_CTX,
+    OLLAMA_NUM_PARALLEL,
+    OLLAMA_NUM_PREDICT,
     OLLAMA_TIMEOUT,
     OLLAMA_THINK,
     OLLAMA_THINK_LEVEL,
     logger,
 )
 
-THINK_LEVELS = {"low", "medium", "high"}
-THINK_TRUE_VALUES = {"1", "true", "yes", "on"}
-THINK_FALSE_VALUES = {"0", "false", "no", "off", "none"}
+try:
+    from orjson import dumps as _json_dumps, loads as _json_loads
+except ImportError:
+    import json
+
+    _json_loads = json.loads
+
+    def _json_dumps(value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+THINK_LEVELS = frozenset({"low", "medium", "high"})
+THINK_TRUE_VALUES = frozenset({"1", "true", "yes", "on"})
+THINK_FALSE_VALUES = frozenset({"0", "false", "no", "off", "none"})
+
+# Mensajes de error (formateados solo cuando ocurre el error).
+_ERROR_CONNECT = (
+    "No se pudo conectar a Ollama. "
+    "Asegurate de que Ollama este corriendo en %s. "
+    "Ejecuta: ollama serve"
+)
+_ERROR_TIMEOUT = (
+    "Ollama tardo mas de %ss en responder. "
+    "El modelo puede estar cargandose. Intenta de nuevo."
+)
+_ERROR_HTTP_STATUS = "Error HTTP de Ollama: %s - %s"
+_ERROR_UNEXPECTED = "Error inesperado al comunicarse con Ollama: %s"
+
+# Maximo de /api/show simultaneos al listar modelos.
+OLLAMA_SHOW_CONCURRENCY = 16
+
+# httpx serializa `json=` con json stdlib; enviamos el body ya serializado.
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Pool de conexiones keep-alive compartido por chat, /api/tags y el fan-out de /api/show.
+OLLAMA_HTTP_LIMITS = httpx.Limits(
+    max_keepalive_connections=32,
+    max_connections=128,
+    keepalive_expiry=60.0,
+)
+OLLAMA_CONNECT_TIMEOUT = 5.0
+# Reintentos ante fallos transitorios (conexion reseteada, 5xx): 100ms -> 400ms.
+OLLAMA_MAX_RETRIES = 2
+OLLAMA_RETRY_BASE_DELAY = 0.1
+_RETRYABLE_ERRORS = (httpx.ConnectError, httpx.RemoteProtocolError, httpx.ReadError)
+
+# Por encima de este tamano el parseo/limpieza se hace en un thread para no frenar el event loop.
+_OFFLOAD_THRESHOLD_BYTES = 64 * 1024
+
+# Ventana en la que check_health reutiliza el ultimo resultado.
+OLLAMA_HEALTH_CACHE_SECONDS = 2.0
+
+
+def _capabilities_key(capabilities: Optional[list[str]]) -> tuple[str, ...]:
+    """Normaliza capabilities a una tupla hashable para las caches."""
+    if not capabilities:
+        return ()
+    return tuple(str(item) for item in capabilities)
+
+
+@lru_cache(maxsize=256)
+def _normalized_capabilities(capabilities: tuple[str, ...]) -> frozenset[str]:
+    return frozenset(item.strip().lower() for item in capabilities if item.strip())
+
+
+@lru_cache(maxsize=256)
+def _infer_think_mode_type(model_name: str, capabilities: tuple[str, ...]) -> str:
+    normalized = model_name.strip().lower()
+    caps = _normalized_capabilities(capabilities)
+
+    if "gpt-oss" in normalized:
+        return "levels"
+    if "thinking" in caps:
+        return "toggle"
+
+    # Fallback por familias/documentacion oficial de thinking.
+    if normalized.startswith("qwen3") or "deepseek-r1" in normalized or "deepseek-v3.1" in normalized:
+        return "toggle"
+
+    return "none"
+
+
+@lru_cache(maxsize=256)
+def _is_chat_model(model_name: str, capabilities: tuple[str, ...]) -> bool:
+    normalized = model_name.strip().lower()
+    if not normalized:
+        return False
+
+    caps = _normalized_capabilities(capabilities)
+
+    # Exclusion explicita solicitada por UX: nomic-embed no es LLM conversacional.
+    if normalized.startswith("nomic-embed"):
+        return False
+
+    # Regla general: si solo soporta embeddings y no completion/chat, no mostrar.
+    if "embedding" in caps and "completion" not in caps and "chat" not in caps:
+        return False
+
+    return True
+
+
+def _strip_think(text: str) -> str:
+    """
+    Elimina bloques <think>...</think> (y el espacio que los sigue) en una pasada.
+
+    Un <think> sin cierre (respuesta cortada) se descarta hasta el final, igual que
+    hace _ThinkStreamFilter en stream_response.
+    """
+    start = text.find("<think>")
+    if start < 0:
+        return text
+
+    parts: list[str] = []
+    pos = 0
+    length = len(text)
+    while start >= 0:
+        end = text.find("</think>", start + 7)
+        if end < 0:
+            parts.append(text[pos:start])
+            pos = length
+            break
+        parts.append(text[pos:start])
+        pos = end + 8
+        while pos < length and text[pos].isspace():
+            pos += 1
+        start = text.find("<think>", pos)
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
+async def _loads_offloaded(content: bytes) -> Any:
+    """Parsea JSON; los payloads grandes (ej: /api/show con licencia) van a un thread."""
+    if len(content) > _OFFLOAD_THRESHOLD_BYTES:
+        return await asyncio.to_thread(_json_loads, content)
+    return _json_loads(content)
+
+
+def _is_retryable(exc: Exception) -> bool:
+    """5xx y errores de conexion se reintentan; timeouts y 4xx no."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return isinstance(exc, _RETRYABLE_ERRORS)
+
+
+def _log_chat_latency(
+    model: str,
+    done_chunk: dict[str, Any],
+    started_ns: int,
+    first_token_ns: int,
+) -> None:
+    """Loguea wall-clock, TTFT y las metricas de prefill/decode que reporta Ollama."""
+    wall_ms = (time.perf_counter_ns() - started_ns) / 1e6
+    ttft_ms = (first_token_ns - started_ns) / 1e6 if first_token_ns else 0.0
+    prompt_tokens = int(done_chunk.get("prompt_eval_count") or 0)
+    prefill_ns = int(done_chunk.get("prompt_eval_duration") or 0)
+    tokens_out = int(done_chunk.get("eval_count") or 0)
+    decode_ns = int(done_chunk.get("eval_duration") or 0)
+    tokens_per_s = tokens_out * 1e9 / decode_ns if decode_ns else 0.0
+    logger.info(
+        "Latencia Ollama model=%s: total=%.0fms ttft=%.0fms prefill=%.0fms (%d tok) "
+        "decode=%.0fms (%d tok, %.1f tok/s)",
+        model,
+        wall_ms,
+        ttft_ms,
+        prefill_ns / 1e6,
+        prompt_tokens,
+        decode_ns / 1e6,
+        tokens_out,
+        tokens_per_s,
+    )
+
+
+@lru_cache(maxsize=128)
+def _canonical_system_prompt(system_prompt: str) -> str:
+    """
+    Forma canonica del system prompt (sin espacios finales por linea ni saltos extra).
+
+    Ollama reutiliza el KV-cache del prefijo solo si los bytes coinciden exactamente;
+    normalizar evita perder el cache por diferencias de espaciado entre callers.
+    El contenido dinamico (memoria, recordatorios) debe ir al final del prompt.
+    """
+    lines = [line.rstrip() for line in system_prompt.strip().splitlines()]
+    canonical: list[str] = []
+    for line in lines:
+        if not line and canonical and not canonical[-1]:
+            continue
+        canonical.append(line)
+    return "\n".join(canonical)
+
+
+def _partial_tag_suffix(text: str, tag: str) -> int:
+    """Largo del prefijo de `tag` con el que termina `text` (tag cortado entre chunks)."""
+    for size in range(min(len(tag) - 1, len(text)), 0, -1):
+        if text.endswith(tag[:size]):
+            return size
+    return 0
+
+
+class _ThinkStreamFilter:
+    """
+    Maquina de estados que elimina <think>...</think> de un stream de deltas.
+
+    Produce el mismo texto que _strip_think sobre la respuesta completa: un bloque
+    sin cierre al terminar el stream se descarta.
+    """
+
+    OPEN_TAG = "<think>"
+    CLOSE_TAG = "</think>"
+
+    def __init__(self) -> None:
+        self._pending = ""
+        self._inside = False
+        self._skip_whitespace = False
+
+    def feed(self, delta: str) -> str:
+        """Consume un delta y devuelve el texto visible que ya es seguro emitir."""
+        text = self._pending + delta
+        self._pending = ""
+        visible: list[str] = []
+        while text:
+            if self._inside:
+                end = text.find(self.CLOSE_TAG)
+                if end < 0:
+                    keep = _partial_tag_suffix(text, self.CLOSE_TAG)
+                    self._pending = text[len(text) - keep:] if keep else ""
+                    break
+                text = text[end + len(self.CLOSE_TAG):]
+                self._inside = False
+                self._skip_whitespace = True
+                continue
+
+            if self._skip_whitespace:
+                text = text.lstrip()
+                if not text:
+                    break
+                self._skip_whitespace = False
+
+            start = text.find(self.OPEN_TAG)
+            if start < 0:
+                keep = _partial_tag_suffix(text, self.OPEN_TAG)
+                visible.append(text[: len(text) - keep])
+                self._pending = text[len(text) - keep:] if keep else ""
+                break
+            visible.append(text[:start])
+            text = text[start + len(self.OPEN_TAG):]
+            self._inside = True
+        return "".join(visible)
+
+    def flush(self) -> str:
+        """Devuelve el texto retenido al final del stream (un bloque abierto se descarta)."""
+        tail = "" if self._inside else self._pending
+        self._pending = ""
+        return tail
 
 
 class OllamaEngine:
@@ -33,23 +289,62 @@ class OllamaEngine:
         timeout: int = OLLAMA_TIMEOUT,
         think: bool = OLLAMA_THINK,
         think_level: Optional[str] = OLLAMA_THINK_LEVEL,
+        keep_alive: str = OLLAMA_KEEP_ALIVE,
+        num_ctx: int = OLLAMA_NUM_CTX,
+        num_batch: int = OLLAMA_NUM_BATCH,
+        num_predict: int = OLLAMA_NUM_PREDICT,
     ):
         self.base_url = base_url.rstrip("/")
         self.model = model
         self.timeout = timeout
         self.think = think
         self.think_level = think_level
+        self.keep_alive = keep_alive
+        # Solo enviamos las opciones configuradas; el resto queda en el default de Ollama.
+        self.options: dict[str, int] = {
+            name: value
+            for name, value in (
+                ("num_ctx", num_ctx),
+                ("num_batch", num_batch),
+                ("num_predict", num_predict),
+            )
+            if value > 0
+        }
         self.chat_url = f"{self.base_url}/api/chat"
         self._client: Optional[httpx.AsyncClient] = None
+        # Metadata de /api/show por modelo; no cambia mientras Ollama sigue arriba.
+        self._show_cache: dict[str, dict[str, Any]] = {}
+        self._show_semaphore = asyncio.Semaphore(OLLAMA_SHOW_CONCURRENCY)
+        self._batch_semaphore = asyncio.Semaphore(OLLAMA_NUM_PARALLEL)
+        self._last_system_message: Optional[dict[str, str]] = None
+        self._last_system_source = ""
+        self._last_health: Optional[tuple[float, bool]] = None
         logger.info(
-            f"OllamaEngine inicializado: modelo={self.model}, "
-            f"url={self.base_url}, think={self.think}, think_level={self.think_level}"
+            "OllamaEngine inicializado: modelo=%s, url=%s, think=%s, think_level=%s",
+            self.model,
+            self.base_url,
+            self.think,
+            self.think_level,
         )
 
+    @property
+    def think_level(self) -> Optional[str]:
+        return self._think_level
+
+    @think_level.setter
+    def think_level(self, value: Optional[str]) -> None:
+        self._think_level = value
+        # Nivel por defecto ya normalizado; _resolve_think_payload corre en cada request.
+        self._default_level = (value or "").strip().lower()
+
     async def _get_client(self) -> httpx.AsyncClient:
         """Retorna un cliente HTTP reutilizable."""
         if self._client is None or self._client.is_closed:
-            self._client = httpx.AsyncClient(timeout=self.timeout)
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=OLLAMA_CONNECT_TIMEOUT),
+                # retries del transport solo reintenta fallos al abrir la conexion.
+                transport=httpx.AsyncHTTPTransport(limits=OLLAMA_HTTP_LIMITS, retries=1),
+            )
         return self._client
 
     async def close(self) -> None:
@@ -58,6 +353,147 @@ class OllamaEngine:
             await self._client.aclose()
             self._client = None
 
+    async def __aenter__(self) -> "OllamaEngine":
+        await self._get_client()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    def _system_message(self, system_prompt: str) -> dict[str, str]:
+        """Reutiliza el dict de sistema mientras el prompt no cambie (p. ej. en generate_batch)."""
+        cached = self._last_system_message
+        if cached is None or self._last_system_source != system_prompt:
+            cached = {"role": "system", "content": _canonical_system_prompt(system_prompt)}
+            self._last_system_message = cached
+            self._last_system_source = system_prompt
+        return cached
+
+    def _build_chat_payload(
+        self,
+        messages: list[dict],
+        system_prompt: str,
+        model: Optional[str],
+        think_mode: Optional[str],
+    ) -> tuple[dict[str, Any], str]:
+        """Arma el payload de /api/chat y devuelve tambien el modo think normalizado."""
+        # Construir lista de mensajes con system prompt al inicio (si el caller ya lo trae, no copiar).
+        first = messages[0] if messages else None
+        ollama_messages: Sequence[dict]
+        if first and first.get("role") == "system" and first.get("content") == system_prompt:
+            ollama_messages = messages
+        else:
+            # Tupla: una sola asignacion; orjson la serializa igual que una lista.
+            ollama_messages = (self._system_message(system_prompt), *messages)
+
+        effective_model = (model or self.model or "").strip() or self.model
+        think_payload, normalized_mode = self._resolve_think_payload(
+            model_name=effective_model,
+            think_mode=think_mode,
+        )
+
+        payload: dict[str, Any] = {
+            "model": effective_model,
+            "messages": ollama_messages,
+            "stream": True,
+            "keep_alive": self.keep_alive,
+        }
+        if self.options:
+            payload["options"] = self.options
+        if think_payload is not None:
+            payload["think"] = think_payload
+        return payload, normalized_mode
+
+    async def _iter_chat_chunks(
+        self,
+        payload: dict[str, Any],
+        normalized_mode: str,
+    ) -> AsyncIterator[str]:
+        """Envia el payload y emite los deltas de contenido del NDJSON de Ollama."""
+        client = await self._get_client()
+        logger.debug(
+            "Enviando request a Ollama: %s mensajes, model=%s, think_mode=%s",
+            len(payload["messages"]),
+            payload["model"],
+            normalized_mode,
+        )
+        body = _json_dumps(payload)
+        for attempt in range(OLLAMA_MAX_RETRIES + 1):
+            started_ns = time.perf_counter_ns() if LOG_LATENCY else 0
+            first_token_ns = 0
+            yielded = False
+            try:
+                # aiter_lines ya re-ensambla lineas partidas entre chunks TCP.
+                async with client.stream(
+                    "POST",
+                    self.chat_url,
+                    content=body,
+                    headers=_JSON_HEADERS,
+                ) as response:
+                    if response.is_error:
+                        await response.aread()
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        chunk = _json_loads(line)
+                        if chunk.get("error"):
+                            raise RuntimeError(chunk["error"])
+                        content = (chunk.get("message") or {}).get("content")
+                        if content:
+                            if started_ns and not first_token_ns:
+                                first_token_ns = time.perf_counter_ns()
+                            yielded = True
+                            yield content
+                        if chunk.get("done"):
+                            if started_ns:
+                                _log_chat_latency(payload["model"], chunk, started_ns, first_token_ns)
+                            break
+                return
+            except (httpx.HTTPStatusError, *_RETRYABLE_ERRORS) as exc:
+                # Solo se reintenta si aun no emitimos nada: no se puede "deshacer" un delta.
+                if yielded or attempt >= OLLAMA_MAX_RETRIES or not _is_retryable(exc):
+                    raise
+                delay = OLLAMA_RETRY_BASE_DELAY * (4 ** attempt)
+                logger.warning(
+                    "Fallo transitorio con Ollama (%s); reintento %d en %.1fs",
+                    type(exc).__name__,
+                    attempt + 1,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+
+    async def stream_response(
+        self,
+        messages: list[dict],
+        system_prompt: str,
+        model: Optional[str] = None,
+        think_mode: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Igual que generate_response, pero emite los tokens visibles a medida que llegan.
+
+        Los bloques <think>...</think> se filtran aunque crucen limites de chunk.
+        Los errores de red se propagan al caller (no se convierten en texto).
+        """
+        payload, normalized_mode = self._build_chat_payload(
+            messages, system_prompt, model, think_mode
+        )
+        chunks = self._iter_chat_chunks(payload, normalized_mode)
+        if payload.get("think") in (None, False):
+            async for delta in chunks:
+                yield delta
+            return
+
+        think_filter = _ThinkStreamFilter()
+        async for delta in chunks:
+            visible = think_filter.feed(delta)
+            if visible:
+                yield visible
+        tail = think_filter.flush()
+        if tail:
+            yield tail
+
     async def generate_response(
         self,
         messages: list[dict],
@@ -75,79 +511,75 @@ class OllamaEngine:
         Returns:
             Respuesta generada por el modelo como string
         """
-        # Construir lista de mensajes con system prompt al inicio
-        ollama_messages = [
-            {"role": "system", "content": system_prompt}
-        ]
-        ollama_messages.extend(messages)
-
-        effective_model = (model or self.model or "").strip() or self.model
-        think_payload, normalized_mode = self._resolve_think_payload(
-            model_name=effective_model,
-            think_mode=think_mode,
+        payload, normalized_mode = self._build_chat_payload(
+            messages, system_prompt, model, think_mode
         )
 
-        payload: dict[str, Any] = {
-            "model": effective_model,
-            "messages": ollama_messages,
-            "stream": False,
-        }
-        if think_payload is not None:
-            payload["think"] = think_payload
-
         try:
-            client = await self._get_client()
-            logger.debug(
-                "Enviando request a Ollama: %s mensajes, model=%s, think_mode=%s",
-                len(ollama_messages),
-                effective_model,
-                normalized_mode,
-            )
-            response = await client.post(self.chat_url, json=payload)
-            response.raise_for_status()
-
-            data = response.json()
-            assistant_message = data.get("message", {}).get("content", "")
+            parts = [delta async for delta in self._iter_chat_chunks(payload, normalized_mode)]
+            assistant_message = "".join(parts)
 
             # Eliminar bloque <think>...</think> del output visible.
             if payload.get("think") not in (None, False) and assistant_message:
-                assistant_message = re.sub(
-                    r"<think>[\s\S]*?</think>\s*", "", assistant_message
-                ).strip()
+                if len(assistant_message) > _OFFLOAD_THRESHOLD_BYTES:
+                    assistant_message = await asyncio.to_thread(_strip_think, assistant_message)
+                else:
+                    assistant_message = _strip_think(assistant_message)
+                assistant_message = assistant_message.strip()
 
             if not assistant_message:
                 logger.warning("Ollama retorno una respuesta vacia")
                 return "Lo siento, no pude generar una respuesta. Intenta de nuevo."
 
-            logger.info(f"Respuesta generada: {len(assistant_message)} caracteres")
+            logger.info("Respuesta generada: %d caracteres", len(assistant_message))
             return assistant_message
 
         except httpx.ConnectError:
-            error_msg = (
-                "No se pudo conectar a Ollama. "
-                f"Asegurate de que Ollama este corriendo en {self.base_url}. "
-                "Ejecuta: ollama serve"
-            )
-            logger.error(error_msg)
-            return f"Error: {error_msg}"
+            return self._error_reply(_ERROR_CONNECT, self.base_url)
 
         except httpx.TimeoutException:
-            error_msg = (
-                f"Ollama tardo mas de {self.timeout}s en responder. "
-                "El modelo puede estar cargandose. Intenta de nuevo."
-            )
-            logger.error(error_msg)
-            return f"Error: {error_msg}"
+            return self._error_reply(_ERROR_TIMEOUT, self.timeout)
 
         except httpx.HTTPStatusError as e:
-            error_msg = f"Error HTTP de Ollama: {e.response.status_code} - {e.response.text}"
-            logger.error(error_msg)
-            return f"Error: {error_msg}"
+            return self._error_reply(_ERROR_HTTP_STATUS, e.response.status_code, e.response.text)
 
         except Exception as e:
-            error_msg = f"Error inesperado al comunicarse con Ollama: {str(e)}"
-            logger.error(error_msg)
-            return f"Error: {error_msg}"
+            return self._error_reply(_ERROR_UNEXPECTED, e)
+
+    @staticmethod
+    def _error_reply(template: str, *args: Any) -> str:
+        """Loguea el error y devuelve el texto que ve el usuario."""
+        logger.error(template, *args)
+        return "Error: " + template % args
+
+    async def generate_batch(
+        self,
+        conversations: list[tuple[list[dict], str]],
+        model: Optional[str] = None,
+        think_mode: Optional[str] = None,
+    ) -> list[str]:
+        """
+        Genera varias respuestas en paralelo para que Ollama las agrupe en sus slots.
+
+        Args:
+            conversations: Lista de (messages, system_prompt)
+
+        Returns:
+            Respuestas en el mismo orden que `conversations`
+        """
+
+        async def _generate_one(messages: list[dict], system_prompt: str) -> str:
+            async with self._batch_semaphore:
+                return await self.generate_response(
+                    messages=messages,
+                    system_prompt=system_prompt,
+                    model=model,
+                    think_mode=think_mode,
+                )
+
+        return await asyncio.gather(
+            *(_generate_one(messages, system_prompt) for messages, system_prompt in conversations)
+        )
 
     @staticmethod
     def infer_think_mode_type(
@@ -160,19 +592,7 @@ class OllamaEngine:
         - toggle: admite on/off (boolean)
         - none: no thinking expuesto
         """
-        normalized = (model_name or "").strip().lower()
-        caps = {str(item).strip().lower() for item in (capabilities or []) if str(item).strip()}
-
-        if "gpt-oss" in normalized:
-            return "levels"
-        if "thinking" in caps:
-            return "toggle"
-
-        # Fallback por familias/documentacion oficial de thinking.
-        if normalized.startswith("qwen3") or "deepseek-r1" in normalized or "deepseek-v3.1" in normalized:
-            return "toggle"
-
-        return "none"
+        return _infer_think_mode_type(model_name or "", _capabilities_key(capabilities))
 
     @classmethod
     def supports_think_levels(
@@ -199,21 +619,7 @@ class OllamaEngine:
         Determina si un modelo es apto para chat.
         Excluye modelos de embeddings puros (ej: nomic-embed*).
         """
-        normalized = (model_name or "").strip().lower()
-        if not normalized:
-            return False
-
-        caps = {str(item).strip().lower() for item in (capabilities or []) if str(item).strip()}
-
-        # Exclusion explicita solicitada por UX: nomic-embed no es LLM conversacional.
-        if normalized.startswith("nomic-embed"):
-            return False
-
-        # Regla general: si solo soporta embeddings y no completion/chat, no mostrar.
-        if "embedding" in caps and "completion" not in caps and "chat" not in caps:
-            return False
-
-        return True
+        return _is_chat_model(model_name or "", _capabilities_key(capabilities))
 
     def _resolve_think_payload(
         self,
@@ -225,9 +631,11 @@ class OllamaEngine:
         - payload `think` para Ollama (None/bool/str)
         - modo normalizado para UI/logs
         """
-        requested = (think_mode or "").strip().lower()
-        default_level = (self.think_level or "").strip().lower()
+        requested = think_mode.strip().lower() if think_mode else ""
+        default_level = self._default_level
         think_mode_type = self.infer_think_mode_type(model_name)
+        if think_mode_type == "none":
+            return None, "none"
 
         if think_mode_type == "levels":
             if requested in THINK_LEVELS:
@@ -271,9 +679,9 @@ class OllamaEngine:
             client = await self._get_client()
             response = await client.get(f"{self.base_url}/api/tags")
             response.raise_for_status()
-            data = response.json()
+            data = await _loads_offloaded(response.content)
         except Exception as exc:
-            logger.warning(f"No se pudieron listar modelos de Ollama: {exc}")
+            logger.warning("No se pudieron listar modelos de Ollama: %s", exc)
             return []
 
         raw_models = data.get("models", [])
@@ -281,16 +689,24 @@ class OllamaEngine:
         seen: set[str] = set()
 
         async def _fetch_show_payload(name: str) -> dict[str, Any]:
+            cached = self._show_cache.get(name)
+            if cached is not None:
+                return cached
             try:
-                show_response = await client.post(
-                    f"{self.base_url}/api/show",
-                    json={"model": name},
-                )
+                async with self._show_semaphore:
+                    show_response = await client.post(
+                        f"{self.base_url}/api/show",
+                        content=_json_dumps({"model": name}),
+                        headers=_JSON_HEADERS,
+                    )
                 show_response.raise_for_status()
-                data = show_response.json()
-                return data if isinstance(data, dict) else {}
+                data = await _loads_offloaded(show_response.content)
             except Exception:
                 return {}
+            if not isinstance(data, dict):
+                return {}
+            self._show_cache[name] = data
+            return data
 
         normalized_entries: list[dict[str, Any]] = []
 
@@ -315,7 +731,11 @@ class OllamaEngine:
                 _fetch_show_payload(str(entry.get("name") or entry.get("model") or "").strip())
                 for entry in normalized_entries
             ]
-            show_payloads = await asyncio.gather(*tasks)
+            gathered = await asyncio.gather(*tasks, return_exceptions=True)
+            show_payloads = [
+                payload if isinstance(payload, dict) else {}
+                for payload in gathered
+            ]
 
         for idx, entry in enumerate(normalized_entries):
             name = str(entry.get("name") or entry.get("model") or "").strip()
@@ -355,12 +775,37 @@ class OllamaEngine:
         models.sort(key=lambda item: item["name"].lower())
         return models
 
+    async def warmup(self) -> bool:
+        """Carga el modelo en Ollama (chat sin mensajes) para evitar la espera en el primer request."""
+        try:
+            client = await self._get_client()
+            response = await client.post(
+                self.chat_url,
+                content=_json_dumps(
+                    {"model": self.model, "messages": [], "keep_alive": self.keep_alive}
+                ),
+                headers=_JSON_HEADERS,
+            )
+            response.raise_for_status()
+        except Exception as e:
+            logger.warning("No se pudo precargar el modelo %s: %s", self.model, e)
+            return False
+        logger.info("Modelo %s precargado (keep_alive=%s)", self.model, self.keep_alive)
+        return True
+
     async def check_health(self) -> bool:
         """Verifica si Ollama esta corriendo y accesible."""
+        now = time.monotonic()
+        if self._last_health is not None and now - self._last_health[0] < OLLAMA_HEALTH_CACHE_SECONDS:
+            return self._last_health[1]
+
         try:
             client = await self._get_client()
-            response = await client.get(f"{self.base_url}/api/tags", timeout=5.0)
-            return response.status_code == 200
+            # HEAD evita transferir la lista completa de modelos.
+            response = await client.head(f"{self.base_url}/api/tags")
+            healthy = response.status_code == 200
         except Exception as e:
-            logger.warning(f"Ollama no esta disponible: {e}")
-            return False
+            logger.warning("Ollama no esta disponible: %s", e)
+            healthy = False
+        self._last_health = (time.monotonic(), healthy)
+        return healthy
@@ -4,42 +4,47 @@ Integra chat, memoria, Telegram, recordatorios y busqueda web.
 """
 
 import asyncio
+import importlib.util
 import os
 import re
 import subprocess
+import sys
+import time
+from collections import OrderedDict, defaultdict, deque
 from contextlib import asynccontextmanager, suppress
-from datetime import datetime, timedelta
+from datetime import datetime
+from functools import lru_cache
 from html import unescape
+from itertools import islice
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Optional, Sequence
 from urllib.parse import urlparse
 
 import uvicorn
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel, Field
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+from pydantic import BaseModel, ConfigDict, Field
 
 from app.capability_registry import CapabilityRegistry
 from app.config import (
     FRONTEND_DIR,
+    HEALTH_CACHE_TTL,
     HOST,
+    LIMIT_CONCURRENCY,
     MAX_CONTEXT_MESSAGES,
     PORT,
     RELOAD,
     TELEGRAM_USER_ID,
+    TIMEOUT_KEEP_ALIVE,
+    WORKERS,
     logger,
 )
 from app.llm_engine import OllamaEngine
 from app.media_stack import (
     build_media_stack_status_response,
+    classify_media_stack_intent,
     get_media_stack_status,
     infer_media_stack_action_semantic,
-    looks_like_media_stack_followup_start_request,
-    looks_like_media_stack_followup_stop_request,
-    looks_like_media_stack_start_request,
-    looks_like_media_stack_stop_request,
-    looks_like_media_stack_status_request,
     start_media_stack_headless,
     stop_media_stack_headless,
 )
@@ -63,45 +68,66 @@ from app.reminder_semantic import extract_multi_reminder_plan, extract_reminder_
 from app.product_scope import ProductScope
 from app.response_verifier import verify_response
 from app.semantic_router import RouteDecision, SemanticRouter
+from app.static_files import FrontendStaticFiles
 from app.system_prompt import build_system_prompt
 from app.time_policy import as_capability_output, build_datetime_context, has_temporal_reference
 from app.utils import contains_datetime_reference, extract_search_intent, truncate_text
 
+# RE2 empareja en tiempo lineal (sin backtracking); si no esta instalado usamos `re`.
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# selectolax (backend Lexbor en C) extrae texto de HTML mucho mas rapido que el regex.
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None  # type: ignore[assignment,misc]
+
 try:
     from app.memory import MemoryManager
 except Exception as exc:
     MemoryManager = None  # type: ignore[assignment]
-    logger.error(f"No se pudo cargar MemoryManager: {exc}")
+    logger.error("No se pudo cargar MemoryManager: %s", exc)
 
 try:
     from app.reminders import ReminderManager
 except Exception as exc:
     ReminderManager = None  # type: ignore[assignment]
-    logger.error(f"No se pudo cargar ReminderManager: {exc}")
+    logger.error("No se pudo cargar ReminderManager: %s", exc)
 
 try:
     from app.web_search import WebSearchEngine
 except Exception as exc:
     WebSearchEngine = None  # type: ignore[assignment]
-    logger.error(f"No se pudo cargar WebSearchEngine: {exc}")
+    logger.error("No se pudo cargar WebSearchEngine: %s", exc)
 
 try:
     from app.telegram_bot import TelegramBot
 except Exception as exc:
     TelegramBot = None  # type: ignore[assignment]
-    logger.error(f"No se pudo cargar TelegramBot: {exc}")
+    logger.error("No se pudo cargar TelegramBot: %s", exc)
 
 try:
     from app.media_handler import RadarrClient
 except Exception as exc:
     RadarrClient = None  # type: ignore[assignment]
-    logger.error(f"No se pudo cargar RadarrClient: {exc}")
+    logger.error("No se pudo cargar RadarrClient: %s", exc)
 
 
 # --- Modelos Pydantic ---
+# Requests: ignoramos campos extra y no revalidamos defaults ya tipados.
+REQUEST_MODEL_CONFIG = ConfigDict(extra="ignore", validate_default=False)
+# Responses: se construyen una vez y no se mutan.
+RESPONSE_MODEL_CONFIG = ConfigDict(frozen=True)
+
+
 class ChatRequest(BaseModel):
     """Modelo de request para el endpoint /chat."""
 
+    model_config = REQUEST_MODEL_CONFIG
+
     message: str
     user_id: str = "default"
     source: str = "api"  # api, desktop, telegram, test
@@ -112,6 +138,8 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     """Modelo de response para el endpoint /chat."""
 
+    model_config = RESPONSE_MODEL_CONFIG
+
     response: str
     movie: Optional[dict[str, Any]] = None  # Datos de película (Fase 6.5)
     model_used: Optional[str] = None
@@ -122,6 +150,8 @@ class ChatResponse(BaseModel):
 class LLMModelOption(BaseModel):
     """Modelo disponible para selector de frontend."""
 
+    model_config = RESPONSE_MODEL_CONFIG
+
     name: str
     display_name: str
     supports_thinking: bool = False
@@ -133,6 +163,8 @@ class LLMModelOption(BaseModel):
 class LLMThinkModeOption(BaseModel):
     """Modo de pensamiento mostrado en selector."""
 
+    model_config = RESPONSE_MODEL_CONFIG
+
     id: str
     label: str
     description: str
@@ -141,6 +173,8 @@ class LLMThinkModeOption(BaseModel):
 class LLMCatalogResponse(BaseModel):
     """Catalogo de modelos + modos para selector frontend."""
 
+    model_config = RESPONSE_MODEL_CONFIG
+
     current_model: str
     current_think_mode: str
     models: list[LLMModelOption]
@@ -151,6 +185,8 @@ class LLMCatalogResponse(BaseModel):
 class RememberRequest(BaseModel):
     """Modelo de request para /remember."""
 
+    model_config = REQUEST_MODEL_CONFIG
+
     info: str
     user_id: str = "default"
     metadata: Optional[dict[str, Any]] = None
@@ -159,6 +195,8 @@ class RememberRequest(BaseModel):
 class RememberResponse(BaseModel):
     """Modelo de response para /remember."""
 
+    model_config = RESPONSE_MODEL_CONFIG
+
     stored: bool
     message: str
 
@@ -166,6 +204,8 @@ class RememberResponse(BaseModel):
 class ReminderCreateRequest(BaseModel):
     """Modelo de request para POST /reminders."""
 
+    model_config = REQUEST_MODEL_CONFIG
+
     text: str = Field(..., min_length=3)
     datetime: Optional[str] = None
     recurring: bool = False
@@ -175,6 +215,8 @@ class ReminderCreateRequest(BaseModel):
 class ReminderDeleteResponse(BaseModel):
     """Modelo de response para DELETE /reminders/{id}."""
 
+    model_config = RESPONSE_MODEL_CONFIG
+
     deleted: bool
     message: str
 
@@ -182,22 +224,77 @@ class ReminderDeleteResponse(BaseModel):
 class RemindersResponse(BaseModel):
     """Modelo de response para GET /reminders."""
 
+    model_config = RESPONSE_MODEL_CONFIG
+
     reminders: list[dict[str, Any]]
 
 
 class HealthResponse(BaseModel):
     """Modelo de response para el endpoint /health."""
 
+    model_config = RESPONSE_MODEL_CONFIG
+
     status: str
     ollama: bool
     radarr: Optional[bool] = None
 
 
 # --- Estado global ---
-conversation_history: dict[str, list[dict[str, str]]] = {}
-pending_reminder_by_user: dict[str, dict[str, str]] = {}
-pending_memory_purge_by_user: dict[str, dict[str, str]] = {}
+# Historial en columnas (roles, contenidos): dos deques acotadas paralelas en vez de
+# un dict por turno. Al anexar se descarta el turno mas viejo en O(1).
+HistoryTurns = tuple[deque[str], deque[str]]
+
+
+def _new_history_turns() -> HistoryTurns:
+    """Crea columnas vacias de historial para un usuario."""
+    return deque(maxlen=MAX_CONTEXT_MESSAGES), deque(maxlen=MAX_CONTEXT_MESSAGES)
+
+
+def _append_history(turns: HistoryTurns, role: str, content: str) -> None:
+    """Anexa un turno manteniendo ambas columnas alineadas."""
+    roles, contents = turns
+    roles.append(role)
+    contents.append(content)
+
+
+def _history_messages(turns: HistoryTurns) -> list[dict[str, str]]:
+    """Materializa el historial como mensajes {role, content} para LLM y modulos semanticos."""
+    roles, contents = turns
+    return [{"role": role, "content": content} for role, content in zip(roles, contents)]
+
+
+def _recent_turn_texts(turns: HistoryTurns, max_items: int = 8) -> list[str]:
+    """Ultimos contenidos no vacios, leidos directo de la columna sin materializar mensajes."""
+    contents = turns[1]
+    texts: list[str] = []
+    for content in islice(contents, max(0, len(contents) - max_items), None):
+        content = content.strip()
+        if content:
+            texts.append(content)
+    return texts
+
+
+def _preview_recent_texts(user_id: str) -> list[str]:
+    """Textos recientes de un usuario sin crear su historial si aun no existe."""
+    turns = conversation_history.get(user_id)
+    return _recent_turn_texts(turns) if turns else []
+
+
+conversation_history: defaultdict[str, HistoryTurns] = defaultdict(_new_history_turns)
+# created_monotonic decide la expiracion; created_at (ISO) queda solo para inspeccion.
+pending_reminder_by_user: dict[str, dict[str, Any]] = {}
+pending_memory_purge_by_user: dict[str, dict[str, Any]] = {}
 latest_web_sources_by_user: dict[str, list[dict[str, str]]] = {}
+# Cache TTL de busquedas web: (capability_id, query) -> (expira_en_monotonic, resultados).
+WEB_SEARCH_CACHE_MAX_ENTRIES = 512
+WEB_SEARCH_CACHE_TTL_SECONDS = 300.0
+WEB_NEWS_CACHE_TTL_SECONDS = 60.0
+web_search_cache: OrderedDict[tuple[str, str], tuple[float, list[dict[str, str]]]] = OrderedDict()
+# Respuestas mas largas se normalizan en un thread para no bloquear el event loop.
+FORMAT_OFFLOAD_THRESHOLD_CHARS = 4096
+# Resumenes de turno: se agrupan para embeberlos en un solo add de Chroma.
+SUMMARY_WRITE_BATCH_SIZE = 16
+SUMMARY_WRITE_FLUSH_SECONDS = 0.5
 CANONICAL_USER_ID = "primary_user"
 USER_ID_ALIASES: set[str] = {"desktop_user"}
 if str(TELEGRAM_USER_ID or "").strip():
@@ -208,9 +305,9 @@ product_scope = ProductScope()
 capability_registry = CapabilityRegistry(product_scope=product_scope)
 missing_in_registry, extra_in_registry = capability_registry.ensure_scope_consistency()
 if missing_in_registry:
-    logger.warning(f"Scope sin capability en registro: {sorted(missing_in_registry)}")
+    logger.warning("Scope sin capability en registro: %s", sorted(missing_in_registry))
 if extra_in_registry:
-    logger.warning(f"Registro fuera de scope: {sorted(extra_in_registry)}")
+    logger.warning("Registro fuera de scope: %s", sorted(extra_in_registry))
 semantic_router = SemanticRouter(
     llm_engine=llm_engine,
     capability_registry=capability_registry,
@@ -222,49 +319,62 @@ if MemoryManager is not None:
     try:
         memory_manager = MemoryManager()
     except Exception as exc:
-        logger.error(f"No se pudo inicializar MemoryManager: {exc}")
+        logger.error("No se pudo inicializar MemoryManager: %s", exc)
 
 reminder_manager = None
 if ReminderManager is not None:
     try:
         reminder_manager = ReminderManager()
     except Exception as exc:
-        logger.error(f"No se pudo inicializar ReminderManager: {exc}")
+        logger.error("No se pudo inicializar ReminderManager: %s", exc)
 
 web_search_engine = None
 if WebSearchEngine is not None:
     try:
         web_search_engine = WebSearchEngine()
     except Exception as exc:
-        logger.error(f"No se pudo inicializar WebSearchEngine: {exc}")
+        logger.error("No se pudo inicializar WebSearchEngine: %s", exc)
 
 radarr_client = None
 if RadarrClient is not None:
     try:
         radarr_client = RadarrClient()
     except Exception as exc:
-        logger.error(f"No se pudo inicializar RadarrClient: {exc}")
+        logger.error("No se pudo inicializar RadarrClient: %s", exc)
 
 telegram_bot = None
 telegram_task: Optional[asyncio.Task] = None
+pending_sweeper_task: Optional[asyncio.Task] = None
+llm_warmup_task: Optional[asyncio.Task] = None
 media_stack_start_task: Optional[asyncio.Task] = None
-
-REMINDER_IMPLICIT_VERB_RE = re.compile(
-    r"\b(recu[eé]rdame|recordarme|no\s+olvidar|av[ií]same|avisame)\b",
-    flags=re.IGNORECASE,
-)
-REMINDER_CREATION_VERB_RE = re.compile(
-    r"\b(crea|crear|activa|activar|programa|programar|pon|poner|agenda|agendar)\b",
-    flags=re.IGNORECASE,
-)
-REMINDER_NOUN_RE = re.compile(
-    r"\b(recordatorio|recordatorios|aviso|avisos)\b",
-    flags=re.IGNORECASE,
-)
-REMINDER_NOUN_SINGULAR_RE = re.compile(
-    r"\b(recordatorio|aviso)\b",
-    flags=re.IGNORECASE,
+# Referencias fuertes a las tareas de guardado en memoria (asyncio solo guarda debiles).
+memory_persist_tasks: set[asyncio.Task] = set()
+summary_write_queue: Optional[asyncio.Queue] = None
+# Ultimo resultado de /health: (monotonic, respuesta). El lock evita sondeos duplicados.
+health_cache: Optional[tuple[float, HealthResponse]] = None
+health_cache_lock = asyncio.Lock()
+summary_writer_task: Optional[asyncio.Task] = None
+
+
+# En RE2 \s es solo ASCII; esta clase replica el \s Unicode de `re`.
+_RE2_UNICODE_SPACE = (
+    r"[\t-\r\x{1c}-\x{20}\x{85}\x{a0}\x{1680}\x{2000}-\x{200a}"
+    r"\x{2028}\x{2029}\x{202f}\x{205f}\x{3000}]"
 )
+
+
+def _compile_linear(pattern: str, ignore_case: bool = False) -> Any:
+    r"""
+    Compila con RE2 los patrones que recorren texto del LLM o de la web.
+    Evitar en patrones de intencion: en RE2 el limite de palabra es solo ASCII.
+    `\s` no debe aparecer dentro de una clase [...]: se expande a otra clase.
+    """
+    if re2 is not None:
+        pattern = pattern.replace(r"\s", _RE2_UNICODE_SPACE)
+        return re2.compile(f"(?i){pattern}" if ignore_case else pattern)
+    return re.compile(pattern, flags=re.IGNORECASE if ignore_case else 0)
+
+
 REMINDER_REQUEST_RE = re.compile(
     r"\b(recu[eé]rdame|recordarme|no\s+olvidar|av[ií]same|avisame)\b|"
     r"\b(crea|crear|activa|activar|programa|programar|pon|poner|agenda|agendar)\b.{0,40}\b(recordatorio|aviso)\b",
@@ -315,6 +425,70 @@ REMINDER_DELETE_ALL_RE = re.compile(
     flags=re.IGNORECASE,
 )
 REMINDER_ID_RE = re.compile(r"\b([a-f0-9]{8})\b", flags=re.IGNORECASE)
+# Literales que aparecen en todo mensaje que los regex deterministas de recordatorios
+# pueden aceptar (listar, borrar, crear); sin ninguno se omiten todos los regex.
+REMINDER_FAST_TOKENS = (
+    "recordatori",
+    "pendiente",
+    "/reminders",
+    "aviso",
+    "recuerdame",
+    "recuérdame",
+    "recordarme",
+    "olvidar",
+    "avisame",
+    "avísame",
+    "elimina",
+    "borra",
+    "quita",
+    "cancela",
+    "remueve",
+    "remover",
+    "completa",
+)
+# Objetivo de borrado en ordenes naturales ("borra el recordatorio de ...").
+REMINDER_DELETE_QUERY_RES = (
+    re.compile(
+        r"(?:recordatorio|recordatorios)\s+(?:de|del|para|sobre|que\s+dice|que\s+diga)\s+(.+)$",
+        flags=re.IGNORECASE,
+    ),
+    re.compile(
+        r"(?:elimina|eliminar|borra|borrar|quita|quitar|cancela|cancelar|"
+        r"remueve|remover|completa|completar)\s+"
+        r"(?:el|la|los|las|mi|mis|un|una)?\s*"
+        r"(?:recordatorio|recordatorios)?\s*(.+)$",
+        flags=re.IGNORECASE,
+    ),
+)
+REMINDER_DELETE_QUERY_PREFIXES = frozenset({"de", "del", "para", "sobre"})
+REMINDER_DELETE_QUERY_STRIP_CHARS = " \t\n\r?¡!.,;:"
+# Un solo barrido clasifica todas las señales de creacion. Son palabras sueltas
+# delimitadas por \b, asi que las alternativas nunca se solapan y finditer
+# equivale a buscar cada patron por separado. El singular va antes que el plural.
+REMINDER_SIGNAL_RE = re.compile(
+    r"\b(?:"
+    r"(?P<noun_singular>recordatorio|aviso)|"
+    r"(?P<noun_plural>recordatorios|avisos)|"
+    r"(?P<implicit_verb>recu[eé]rdame|recordarme|no\s+olvidar|av[ií]same|avisame)|"
+    r"(?P<creation_verb>crea|crear|activa|activar|programa|programar|pon|poner|agenda|agendar)|"
+    r"(?P<datetime_hint>"
+    r"mañana|manana|pasado\s+mañana|hoy|esta\s+noche|"
+    r"lunes|martes|mi[eé]rcoles|jueves|viernes|s[áa]bado|domingo|"
+    r"\d{1,2}:\d{2}|\d{1,2}\s*(?:am|pm)|"
+    r"a\s*las\s*\d{1,2}|en\s*\d+\s*(?:minutos?|horas?|d[ií]as?)|"
+    r"dentro\s*de\s*\d+\s*(?:minutos?|horas?|d[ií]as?)"
+    r")"
+    r")\b",
+    flags=re.IGNORECASE,
+)
+# Preguntas, listados o borrados: cualquiera descarta la creacion.
+REMINDER_NOT_CREATION_RE = re.compile(
+    "|".join(
+        f"(?:{pattern.pattern})"
+        for pattern in (REMINDER_QUESTION_RE, REMINDER_LIST_RE, REMINDER_DELETE_RE)
+    ),
+    flags=re.IGNORECASE,
+)
 MEMORY_DOMAIN_RE = re.compile(
     r"\b(memoria|memorias|largo\s+plazo|recuerdo|recuerdos|perfil|conversaciones?)\b",
     flags=re.IGNORECASE,
@@ -326,6 +500,10 @@ MEMORY_ACTION_RE = re.compile(
     flags=re.IGNORECASE,
 )
 MEMORY_QUOTED_TARGET_RE = re.compile(r"[\"'“”‘’]([^\"“”‘’']{2,220})[\"'“”‘’]")
+MEMORY_DIGIT_TOKEN_RE = re.compile(r"\b[A-Za-zÁÉÍÓÚáéíóúÑñ_]*\d+[A-Za-z0-9ÁÉÍÓÚáéíóúÑñ_]*\b")
+MULTI_REMINDER_Y_RE = re.compile(r"\by\b")
+MULTI_REMINDER_Y_PARA_RE = re.compile(r"\by\s+para\b")
+MULTI_REMINDER_PARA_RE = re.compile(r"\bpara\b")
 MULTI_REMINDER_HINT_RE = re.compile(
     r"\b(y\s+otro|y\s+otra|adem[aá]s|tambi[eé]n|dos|2)\b|\n\s*\d+[.)]\s*",
     flags=re.IGNORECASE,
@@ -343,7 +521,34 @@ WEB_INTENT_HINT_RE = re.compile(
 TABLE_SEPARATOR_LINE_RE = re.compile(
     r"^\|?\s*[:\-\u2013\u2014\u2500]{3,}(?:\s*\|\s*[:\-\u2013\u2014\u2500]{3,})+\s*\|?$"
 )
-HTML_TABLE_TAG_RE = re.compile(r"</?(table|thead|tbody|tr|th|td)\b", flags=re.IGNORECASE)
+HTML_TABLE_TAG_RE = _compile_linear(r"</?(table|thead|tbody|tr|th|td)\b", ignore_case=True)
+# <br> y etiquetas de tabla primero; el resto de HTML cae en la ultima alternativa.
+HTML_MARKUP_RE = _compile_linear(
+    r"(?P<br><br\s*/?>)|"
+    r"<(?P<closing>/?)(?P<tag>table|thead|tbody|tr|th|td)\b(?P<attrs>[^>]*)>|"
+    r"<[^>]+>",
+    ignore_case=True,
+)
+HTML_BR_RE = re.compile(r"<br\s*/?>", flags=re.IGNORECASE)
+MEMORY_RECALL_HINT_RE = re.compile(
+    r"\b(que\s+recuerdas|que\s+sabes\s+de\s+mi|mi\s+perfil)\b",
+    flags=re.IGNORECASE,
+)
+GENERIC_REFUSAL_FRAGMENT_RE = re.compile(r"no\s+puedo\s+ayudar\s+con\s+eso", flags=re.IGNORECASE)
+FORMAT_QUOTE_PREFIX_RE = re.compile(r"^>\s*")
+FORMAT_TRAILING_PIPE_RE = re.compile(r"\s+\|\s*$")
+FORMAT_SERVICE_HEADER_RE = re.compile(r"\bservicio\b", flags=re.IGNORECASE)
+# Cuantificadores anidados sobre filas que escribe el LLM: candidato claro a RE2.
+FORMAT_ROW_RE = _compile_linear(
+    r"^\|?\s*\*{0,3}([^|*][^|]{1,80}?)\*{0,3}\s*\|\s*([^|]{1,220}?)(?:\s*\|.*)?$"
+)
+FORMAT_HAS_LETTER_RE = re.compile(r"[A-Za-zÁÉÍÓÚáéíóúÑñ]")
+FORMAT_EDGE_STARS_RE = re.compile(r"^\*+|\*+$")
+FORMAT_SERVICE_NAME_RE = re.compile(r"^[A-Za-zÁÉÍÓÚáéíóúÑñ][A-Za-zÁÉÍÓÚáéíóúÑñ0-9+ .,'/()\-]{1,80}$")
+FORMAT_BULLET_RE = re.compile(r"^\s*[•●▪◦\-*+]\s+(.+)$")
+FORMAT_BULLET_PREFIX_RE = re.compile(r"^\s*[•●▪◦\-*+]\s+")
+FORMAT_PRICE_RE = re.compile(r"^[\d$€].{2,}$")
+FORMAT_BLANK_RUN_RE = re.compile(r"\n{3,}")
 GENERIC_REFUSAL_RE = re.compile(
     r"^(lo\s+siento[, ]*)?(pero\s+)?no\s+puedo\s+ayudar\s+con\s+eso\.?\s*$",
     flags=re.IGNORECASE,
@@ -352,8 +557,8 @@ BENIGN_OPINION_HINT_RE = re.compile(
     r"\b(opini[oó]n|opinas|pel[ií]cula|pel[ií]culas|serie|series|libro|m[uú]sica|juego|recomienda|truman)\b",
     flags=re.IGNORECASE,
 )
-HTML_TAG_RE = re.compile(r"<[^>]+>")
-WEB_QUERY_STOPWORDS = {
+HTML_TAG_RE = _compile_linear(r"<[^>]+>")
+WEB_QUERY_STOPWORDS: frozenset[str] = frozenset({
     "a",
     "actual",
     "actuales",
@@ -419,7 +624,7 @@ WEB_QUERY_STOPWORDS = {
     "uno",
     "web",
     "y",
-}
+})
 WEB_FOLLOWUP_REFRESH_RE = re.compile(
     r"\b(actualiza|actualizar|ultim[oa]s?|datos?\s+recientes|de\s+nuevo|otra\s+vez|nuevamente|repite)\b",
     flags=re.IGNORECASE,
@@ -431,7 +636,21 @@ WEB_EXPLICIT_REQUEST_RE = re.compile(
     r"\b(en\s+(?:la\s+)?(?:web|internet|google))\b",
     flags=re.IGNORECASE,
 )
-THINK_MODE_ALLOWED_VALUES = {
+WEB_QUERY_POLITE_PREFIX_RE = re.compile(
+    r"^(puedes|podrias|podr[ií]as|me\s+puedes|me\s+podr[ií]as)\s+",
+    flags=re.IGNORECASE,
+)
+WEB_QUERY_SEARCH_VERB_PREFIX_RE = re.compile(
+    r"^(buscar|busca|investigar|investiga|consultar|consulta)\s+",
+    flags=re.IGNORECASE,
+)
+WEB_TERM_TOKEN_RE = re.compile(r"[a-z0-9áéíóúñ+.-]{2,}")
+WEB_PRICE_HINT_RE = re.compile(r"\b(precio|cotizaci[oó]n|valor)\b")
+WEB_SOURCES_HEADER_RE = re.compile(r"\bfuentes?\b", flags=re.IGNORECASE)
+TOPIC_FILLER_VERB_RE = re.compile(r"\b(haz|hace|dame|quiero|necesito)\b", flags=re.IGNORECASE)
+TOPIC_REPEAT_RE = re.compile(r"\b(de\s+nuevo|otra\s+vez|nuevamente)\b", flags=re.IGNORECASE)
+TOPIC_TOKEN_RE = re.compile(r"[A-Za-z0-9ÁÉÍÓÚáéíóúÑñ+.-]{2,}")
+THINK_MODE_ALLOWED_VALUES: frozenset[str] = frozenset({
     "low",
     "medium",
     "high",
@@ -441,7 +660,7 @@ THINK_MODE_ALLOWED_VALUES = {
     "false",
     "1",
     "0",
-}
+})
 
 
 def _friendly_model_display_name(model_name: str) -> str:
@@ -467,21 +686,13 @@ def _friendly_model_display_name(model_name: str) -> str:
     return raw
 
 
+# Funciones puras sobre texto: se repiten por turno (historial, fuentes), asi que se memoizan.
+@lru_cache(maxsize=2048)
 def _normalize_web_query(text: str) -> str:
     """Limpia una consulta para usarla en busqueda web."""
     cleaned = text.strip()
-    cleaned = re.sub(
-        r"^(puedes|podrias|podr[ií]as|me\s+puedes|me\s+podr[ií]as)\s+",
-        "",
-        cleaned,
-        flags=re.IGNORECASE,
-    )
-    cleaned = re.sub(
-        r"^(buscar|busca|investigar|investiga|consultar|consulta)\s+",
-        "",
-        cleaned,
-        flags=re.IGNORECASE,
-    )
+    cleaned = WEB_QUERY_POLITE_PREFIX_RE.sub("", cleaned)
+    cleaned = WEB_QUERY_SEARCH_VERB_PREFIX_RE.sub("", cleaned)
     return cleaned.strip(" \t\n\r?¡!.,;:")
 
 
@@ -530,7 +741,7 @@ def _is_explicit_web_request(message: str) -> bool:
 
 def _tokenize_web_terms(text: str) -> list[str]:
     """Tokeniza texto para estimar si una consulta web tiene señal semantica."""
-    return re.findall(r"[a-z0-9áéíóúñ+.-]{2,}", text.lower())
+    return WEB_TERM_TOKEN_RE.findall(text.lower())
 
 
 def _is_low_signal_web_query(query: str) -> bool:
@@ -538,33 +749,25 @@ def _is_low_signal_web_query(query: str) -> bool:
     tokens = _tokenize_web_terms(query)
     if not tokens:
         return True
-    meaningful = [token for token in tokens if token not in WEB_QUERY_STOPWORDS]
-    return len(meaningful) == 0
+    return WEB_QUERY_STOPWORDS.issuperset(tokens)
 
 
+@lru_cache(maxsize=2048)
 def _extract_topic_hint_from_text(text: str, max_terms: int = 7) -> str:
     """
     Extrae terminos tema de un mensaje previo para enriquecer follow-ups web.
     Ejemplo: 'compara Disney vs Netflix en tabla' -> 'Disney Netflix'.
     """
     cleaned = _normalize_web_query(text)
-    cleaned = re.sub(
-        r"\b(haz|hace|dame|quiero|necesito)\b",
-        " ",
-        cleaned,
-        flags=re.IGNORECASE,
-    )
-    cleaned = re.sub(r"\b(de\s+nuevo|otra\s+vez|nuevamente)\b", " ", cleaned, flags=re.IGNORECASE)
+    cleaned = TOPIC_FILLER_VERB_RE.sub(" ", cleaned)
+    cleaned = TOPIC_REPEAT_RE.sub(" ", cleaned)
 
     terms: list[str] = []
     seen: set[str] = set()
-    for raw_token in re.findall(r"[A-Za-z0-9ÁÉÍÓÚáéíóúÑñ+.-]{2,}", cleaned):
+    stopwords = WEB_QUERY_STOPWORDS
+    for raw_token in TOPIC_TOKEN_RE.findall(cleaned):
         token_l = raw_token.lower()
-        if token_l in WEB_QUERY_STOPWORDS:
-            continue
-        if token_l.isdigit():
-            continue
-        if token_l in seen:
+        if token_l in stopwords or token_l in seen or token_l.isdigit():
             continue
         seen.add(token_l)
         terms.append(raw_token)
@@ -583,7 +786,7 @@ def _infer_topic_hint_from_history(
 
     current_l = current_message.strip().lower()
     # Recorremos hacia atras y tomamos el ultimo mensaje de usuario con señal tematica.
-    for item in reversed(history[:-1]):
+    for item in islice(reversed(history), 1, None):
         if item.get("role") != "user":
             continue
         content = item.get("content", "").strip()
@@ -606,35 +809,55 @@ def _remove_reminder_denials(text: str) -> str:
     return cleaned
 
 
+@lru_cache(maxsize=2048)
 def _sanitize_web_text(value: str, max_length: int = 220) -> str:
     """Limpia texto proveniente de buscadores (quita HTML y compacta espacios)."""
     if not value:
         return ""
-    cleaned = unescape(str(value))
-    cleaned = HTML_TAG_RE.sub(" ", cleaned)
-    cleaned = re.sub(r"\s+", " ", cleaned).strip(" \t\n\r-–—|")
+    cleaned = str(value)
+    # Cada resultado se sanea varias veces por turno (contexto, fuentes, fallback);
+    # el cache y los atajos evitan repetir pasadas sobre texto ya limpio.
+    if "<" in cleaned and LexborHTMLParser is not None:
+        # El parser ya decodifica las entidades: sobre el texto crudo y una sola vez
+        # (unescape previo convertiria "&amp;lt;" en una etiqueta literal).
+        cleaned = LexborHTMLParser(cleaned).text(separator=" ")
+    else:
+        if "&" in cleaned:
+            cleaned = unescape(cleaned)
+        if "<" in cleaned:
+            cleaned = HTML_TAG_RE.sub(" ", cleaned)
+    # split() usa el mismo conjunto de espacios Unicode que \s en `re`.
+    cleaned = " ".join(cleaned.split()).strip(" \t\n\r-–—|")
     if not cleaned:
         return ""
     return truncate_text(cleaned, max_length=max_length)
 
 
+@lru_cache(maxsize=4096)
+def _domain_of(url: str) -> str:
+    """Dominio en minusculas sin 'www.'; internado porque se repite entre turnos."""
+    try:
+        domain = (urlparse(url).netloc or "").lower()
+    except Exception:
+        return ""
+    if domain.startswith("www."):
+        domain = domain[4:]
+    return sys.intern(domain)
+
+
+@lru_cache(maxsize=2048)
 def _source_markdown_link(url: str) -> str:
     """Convierte URL en markdown corto con dominio como etiqueta."""
     safe_url = (url or "").strip()
     if not safe_url:
         return ""
-    try:
-        parsed = urlparse(safe_url)
-        domain = (parsed.netloc or "").lower()
-        if domain.startswith("www."):
-            domain = domain[4:]
-        if domain:
-            return f"[{domain}]({safe_url})"
-    except Exception:
-        pass
+    domain = _domain_of(safe_url)
+    if domain:
+        return f"[{domain}]({safe_url})"
     return safe_url
 
 
+@lru_cache(maxsize=4096)
 def _normalize_web_source_url(value: str) -> str:
     """Normaliza URL de fuente y descarta entradas no validas."""
     raw = str(value or "").strip()
@@ -668,13 +891,7 @@ def _build_source_entries(results: list[dict[str, str]], max_sources: int = 6) -
         seen_urls.add(key)
 
         title = _sanitize_web_text(result.get("title", ""), max_length=120)
-        domain = ""
-        try:
-            domain = urlparse(url).netloc.lower()
-            if domain.startswith("www."):
-                domain = domain[4:]
-        except Exception:
-            domain = ""
+        domain = _domain_of(url)
 
         label = title or domain or url
         entry = {"url": url, "label": label}
@@ -717,7 +934,7 @@ def _append_telegram_sources_block(text: str, results: list[dict[str, str]], max
         return text
     if not results:
         return text
-    if re.search(r"\bfuentes?\b", text, flags=re.IGNORECASE):
+    if WEB_SOURCES_HEADER_RE.search(text):
         return text
 
     sources: list[str] = []
@@ -741,50 +958,62 @@ def _append_telegram_sources_block(text: str, results: list[dict[str, str]], max
     return f"{text.strip()}\n\n" + "\n".join(source_lines)
 
 
-def _get_pending_reminder(user_id: str) -> Optional[dict[str, str]]:
-    """Retorna recordatorio pendiente del usuario si no expiro."""
-    pending = pending_reminder_by_user.get(user_id)
+def _new_pending_state(**fields: Any) -> dict[str, Any]:
+    """Estado pendiente con marca monotonica para expirar sin parsear fechas."""
+    return {
+        **fields,
+        "created_at": datetime.now().isoformat(),
+        "created_monotonic": time.monotonic(),
+    }
+
+
+def _get_live_pending(
+    store: dict[str, dict[str, Any]],
+    user_id: str,
+    ttl_minutes: int,
+) -> Optional[dict[str, Any]]:
+    """Retorna el estado pendiente del usuario, descartandolo si expiro."""
+    pending = store.get(user_id)
     if not pending:
         return None
 
-    created_at = pending.get("created_at", "")
-    try:
-        created_dt = datetime.fromisoformat(created_at)
-    except Exception:
-        pending_reminder_by_user.pop(user_id, None)
+    created_monotonic = pending.get("created_monotonic")
+    if not isinstance(created_monotonic, float):
+        store.pop(user_id, None)
         return None
 
-    if datetime.now() - created_dt > timedelta(minutes=REMINDER_PENDING_TTL_MINUTES):
-        pending_reminder_by_user.pop(user_id, None)
+    if time.monotonic() - created_monotonic > ttl_minutes * 60:
+        store.pop(user_id, None)
         return None
     return pending
 
 
-def _get_pending_memory_purge(user_id: str) -> Optional[dict[str, str]]:
-    """Retorna solicitud pendiente de purga de memoria si no expiro."""
-    pending = pending_memory_purge_by_user.get(user_id)
-    if not pending:
-        return None
+def _sweep_expired_pending_states() -> int:
+    """Descarta estados pendientes vencidos aunque el usuario no vuelva a escribir."""
+    evicted = 0
+    for store, ttl_minutes in (
+        (pending_reminder_by_user, REMINDER_PENDING_TTL_MINUTES),
+        (pending_memory_purge_by_user, MEMORY_PURGE_PENDING_TTL_MINUTES),
+    ):
+        for user_id in list(store):
+            if _get_live_pending(store, user_id, ttl_minutes) is None:
+                evicted += 1
+    return evicted
 
-    created_at = pending.get("created_at", "")
-    try:
-        created_dt = datetime.fromisoformat(created_at)
-    except Exception:
-        pending_memory_purge_by_user.pop(user_id, None)
-        return None
 
-    if datetime.now() - created_dt > timedelta(minutes=MEMORY_PURGE_PENDING_TTL_MINUTES):
-        pending_memory_purge_by_user.pop(user_id, None)
-        return None
-    return pending
+def _get_pending_reminder(user_id: str) -> Optional[dict[str, Any]]:
+    """Retorna recordatorio pendiente del usuario si no expiro."""
+    return _get_live_pending(pending_reminder_by_user, user_id, REMINDER_PENDING_TTL_MINUTES)
+
+
+def _get_pending_memory_purge(user_id: str) -> Optional[dict[str, Any]]:
+    """Retorna solicitud pendiente de purga de memoria si no expiro."""
+    return _get_live_pending(pending_memory_purge_by_user, user_id, MEMORY_PURGE_PENDING_TTL_MINUTES)
 
 
 def _set_pending_memory_purge(user_id: str, reason: str = "semantic_request") -> None:
     """Guarda estado pendiente para confirmar borrado total de memoria."""
-    pending_memory_purge_by_user[user_id] = {
-        "reason": reason,
-        "created_at": datetime.now().isoformat(),
-    }
+    pending_memory_purge_by_user[user_id] = _new_pending_state(reason=reason)
 
 
 def _clear_pending_memory_purge(user_id: str) -> None:
@@ -923,20 +1152,24 @@ def _handle_protocols_overview_query(message: str) -> Optional[str]:
     return None
 
 
+def _has_reminder_keyword(message_lower: str) -> bool:
+    """Filtro barato por substrings antes de los regex de recordatorios."""
+    return any(token in message_lower for token in REMINDER_FAST_TOKENS)
+
+
 def _looks_like_reminder_creation_request(message: str) -> bool:
     """Detecta peticiones de creacion de recordatorio, incluso sin verbo explicito."""
     if _looks_like_memory_management_request(message):
         return False
-    if REMINDER_QUESTION_RE.search(message) or REMINDER_LIST_RE.search(message):
-        return False
-    if REMINDER_DELETE_RE.search(message):
+    if REMINDER_NOT_CREATION_RE.search(message):
         return False
 
-    has_datetime_hint = bool(REMINDER_DATETIME_HINT_RE.search(message))
-    has_noun = bool(REMINDER_NOUN_RE.search(message))
-    has_noun_singular = bool(REMINDER_NOUN_SINGULAR_RE.search(message))
-    has_implicit_verb = bool(REMINDER_IMPLICIT_VERB_RE.search(message))
-    has_creation_verb = bool(REMINDER_CREATION_VERB_RE.search(message))
+    signals = {match.lastgroup for match in REMINDER_SIGNAL_RE.finditer(message)}
+    has_datetime_hint = "datetime_hint" in signals
+    has_noun_singular = "noun_singular" in signals
+    has_noun = has_noun_singular or "noun_plural" in signals
+    has_implicit_verb = "implicit_verb" in signals
+    has_creation_verb = "creation_verb" in signals
 
     # Modo explicito de recordatorio: si el usuario habla de "recordatorio/aviso",
     # lo tratamos como intento de creación solo cuando hay señal de acción.
@@ -966,7 +1199,7 @@ def _looks_like_memory_management_request(message: str) -> bool:
         return False
     if MEMORY_ACTION_RE.search(text):
         return True
-    if re.search(r"\b(que\s+recuerdas|que\s+sabes\s+de\s+mi|mi\s+perfil)\b", text, flags=re.IGNORECASE):
+    if MEMORY_RECALL_HINT_RE.search(text):
         return True
     return False
 
@@ -978,9 +1211,9 @@ def _looks_like_multi_reminder_request(message: str) -> bool:
         return False
     lowered = text.lower()
     datetime_hits = REMINDER_DATETIME_HINT_RE.findall(text)
-    if len(datetime_hits) >= 2 and re.search(r"\by\b", lowered):
+    if len(datetime_hits) >= 2 and MULTI_REMINDER_Y_RE.search(lowered):
         return True
-    if re.search(r"\by\s+para\b", lowered) and len(re.findall(r"\bpara\b", lowered)) >= 2:
+    if MULTI_REMINDER_Y_PARA_RE.search(lowered) and len(MULTI_REMINDER_PARA_RE.findall(lowered)) >= 2:
         return True
     if not MULTI_REMINDER_HINT_RE.search(text):
         return False
@@ -1004,7 +1237,7 @@ def _extract_explicit_memory_target(message: str) -> str:
         if candidates:
             return max(candidates, key=len)
 
-    token_with_digits = re.findall(r"\b[A-Za-zÁÉÍÓÚáéíóúÑñ_]*\d+[A-Za-z0-9ÁÉÍÓÚáéíóúÑñ_]*\b", text)
+    token_with_digits = MEMORY_DIGIT_TOKEN_RE.findall(text)
     if token_with_digits:
         return token_with_digits[-1].strip()
 
@@ -1153,43 +1386,66 @@ def _is_generic_refusal(text: str) -> bool:
     return bool(GENERIC_REFUSAL_RE.match(cleaned))
 
 
+def _response_is_empty_or_error(text: str) -> bool:
+    """Detecta salidas del LLM vacias, de error o demasiado cortas para ser utiles."""
+    stripped = text.strip()
+    return (
+        not stripped
+        or text.startswith("Error:")
+        or stripped.upper() == "NADA"
+        or len(stripped) <= 8
+        or "no pude generar una respuesta" in stripped.lower()
+    )
+
+
+def _is_memory_noise_line(line: str) -> bool:
+    """Detecta lineas de rechazo o error que no aportan contexto (las vacias se conservan)."""
+    return (
+        _is_generic_refusal(line)
+        or GENERIC_REFUSAL_FRAGMENT_RE.search(line) is not None
+        or "no pude generar una respuesta" in line.lower()
+    )
+
+
 def _sanitize_memory_context(context: str) -> str:
     """Quita frases de rechazo generico del contexto de memoria recuperado."""
     if not context:
         return ""
+    is_noise = _is_memory_noise_line
+    return "\n".join(line for line in context.splitlines() if not is_noise(line)).strip()
 
-    cleaned_lines: list[str] = []
-    for raw_line in context.splitlines():
-        line = raw_line.strip()
-        if not line:
-            cleaned_lines.append(raw_line)
-            continue
-        if _is_generic_refusal(line):
-            continue
-        if re.search(r"no\s+puedo\s+ayudar\s+con\s+eso", line, flags=re.IGNORECASE):
-            continue
-        if "no pude generar una respuesta" in line.lower():
-            continue
-        cleaned_lines.append(raw_line)
-
-    return "\n".join(cleaned_lines).strip()
 
-
-def _sanitize_history_for_generation(history: list[dict[str, str]]) -> list[dict[str, str]]:
+def _sanitize_history_for_generation(history: Sequence[dict[str, str]]) -> list[dict[str, str]]:
     """
     Evita mandar al modelo respuestas de rechazo generico del asistente
     para romper bucles de repeticion.
     """
-    filtered: list[dict[str, str]] = []
-    for item in history:
-        role = item.get("role", "")
-        content = item.get("content", "")
-        if role == "assistant" and _is_generic_refusal(content):
+    # Recorremos desde el final y paramos al llenar la ventana de contexto.
+    is_generic_refusal = _is_generic_refusal
+    kept: list[dict[str, str]] = []
+    for item in reversed(history):
+        if item.get("role", "") == "assistant" and is_generic_refusal(item.get("content", "")):
             continue
-        filtered.append(item)
-    if len(filtered) > MAX_CONTEXT_MESSAGES:
-        return filtered[-MAX_CONTEXT_MESSAGES:]
-    return filtered
+        kept.append(item)
+        if len(kept) >= MAX_CONTEXT_MESSAGES:
+            break
+    kept.reverse()
+    return kept
+
+
+def _replace_html_markup(match: Any) -> str:
+    """Traduce una etiqueta HTML (br o de tabla) a su equivalente en texto plano."""
+    if match.group("br"):
+        return "\n"
+    tag = match.group("tag")
+    if not tag or not match.group("closing") or match.group("attrs"):
+        return ""
+    tag = tag.lower()
+    if tag == "tr":
+        return "\n"
+    if tag in {"th", "td"}:
+        return " | "
+    return ""
 
 
 def _normalize_response_format(text: str) -> str:
@@ -1200,17 +1456,17 @@ def _normalize_response_format(text: str) -> str:
     cleaned = (text or "").strip()
     if not cleaned:
         return cleaned
+    # Sin pipes ni markup no hay tabla ni HTML que reescribir (caso habitual).
+    if "|" not in cleaned and "｜" not in cleaned and "<" not in cleaned:
+        return cleaned
 
-    cleaned = re.sub(r"<br\s*/?>", "\n", cleaned, flags=re.IGNORECASE)
     cleaned = cleaned.replace("｜", "|")
 
+    # Una sola pasada: con tablas HTML se limpia todo el markup; si no, solo <br>.
     if HTML_TABLE_TAG_RE.search(cleaned):
-        cleaned = re.sub(r"</?(table|thead|tbody)\b[^>]*>", "", cleaned, flags=re.IGNORECASE)
-        cleaned = re.sub(r"<tr\b[^>]*>", "", cleaned, flags=re.IGNORECASE)
-        cleaned = re.sub(r"</tr>", "\n", cleaned, flags=re.IGNORECASE)
-        cleaned = re.sub(r"<t[hd]\b[^>]*>", "", cleaned, flags=re.IGNORECASE)
-        cleaned = re.sub(r"</t[hd]>", " | ", cleaned, flags=re.IGNORECASE)
-        cleaned = re.sub(r"<[^>]+>", "", cleaned)
+        cleaned = HTML_MARKUP_RE.sub(_replace_html_markup, cleaned)
+    elif "<" in cleaned:
+        cleaned = HTML_BR_RE.sub("\n", cleaned)
 
     lines = cleaned.splitlines()
 
@@ -1256,33 +1512,36 @@ def _normalize_response_format(text: str) -> str:
         return cleaned
 
     rewritten_lines: list[str] = []
+    # Metodos ligados a locales: el bucle corre por cada linea de la respuesta.
+    append = rewritten_lines.append
+    strip_quote_prefix = FORMAT_QUOTE_PREFIX_RE.sub
+    strip_trailing_pipe = FORMAT_TRAILING_PIPE_RE.sub
+    match_separator = TABLE_SEPARATOR_LINE_RE.match
+    match_row = FORMAT_ROW_RE.match
+    match_bullet = FORMAT_BULLET_RE.match
+    match_price = FORMAT_PRICE_RE.match
     for raw_line in lines:
         line = raw_line.strip()
         if not line:
             if rewritten_lines and rewritten_lines[-1]:
-                rewritten_lines.append("")
+                append("")
             continue
 
-        line = re.sub(r"^>\s*", "", line)
-        line = re.sub(r"\s+\|\s*$", "", line)
+        line = strip_quote_prefix("", line)
+        line = strip_trailing_pipe("", line)
 
         normalized_sep = line.replace("—", "-").replace("–", "-").replace("─", "-")
-        if TABLE_SEPARATOR_LINE_RE.match(normalized_sep):
+        if match_separator(normalized_sep):
             continue
 
-        if "|" in line and re.search(r"\bservicio\b", line, flags=re.IGNORECASE):
+        if "|" in line and FORMAT_SERVICE_HEADER_RE.search(line):
             continue
 
-        row_match = re.match(
-            r"^\|?\s*\*{0,3}([^|*][^|]{1,80}?)\*{0,3}\s*\|\s*([^|]{1,220}?)(?:\s*\|.*)?$",
-            line,
-        )
-        if row_match and re.search(r"[A-Za-zÁÉÍÓÚáéíóúÑñ]", row_match.group(1)):
-            service = re.sub(r"^\*+|\*+$", "", row_match.group(1)).strip(" :")
+        row_match = match_row(line)
+        if row_match and FORMAT_HAS_LETTER_RE.search(row_match.group(1)):
+            service = FORMAT_EDGE_STARS_RE.sub("", row_match.group(1)).strip(" :")
             price = row_match.group(2).strip(" :")
-            is_valid_service = bool(
-                re.match(r"^[A-Za-zÁÉÍÓÚáéíóúÑñ][A-Za-zÁÉÍÓÚáéíóúÑñ0-9+ .,'/()\-]{1,80}$", service)
-            )
+            is_valid_service = bool(FORMAT_SERVICE_NAME_RE.match(service))
             if is_valid_service and service.lower() not in {
                 "servicio",
                 "pros",
@@ -1292,59 +1551,59 @@ def _normalize_response_format(text: str) -> str:
                 "feature",
             }:
                 if rewritten_lines and rewritten_lines[-1]:
-                    rewritten_lines.append("")
-                rewritten_lines.append(f"### {service}")
+                    append("")
+                append(f"### {service}")
                 if price:
-                    rewritten_lines.append(f"- Precio: {price}")
+                    append(f"- Precio: {price}")
                 continue
 
-        bullet_match = re.match(r"^\s*[•●▪◦\-*+]\s+(.+)$", line)
+        bullet_match = match_bullet(line)
         if bullet_match:
             bullet_text = bullet_match.group(1).strip().rstrip("|").strip()
             bullet_segments = [segment.strip() for segment in bullet_text.split("|") if segment.strip()]
             for segment in bullet_segments:
-                segment = re.sub(r"^\s*[•●▪◦\-*+]\s+", "", segment).strip()
+                segment = FORMAT_BULLET_PREFIX_RE.sub("", segment).strip()
                 if segment:
-                    rewritten_lines.append(f"- {segment}")
+                    append(f"- {segment}")
             continue
 
         if "|" in line:
             segments = [segment.strip() for segment in line.split("|") if segment.strip()]
             for segment in segments:
-                segment_bullet = re.match(r"^\s*[•●▪◦\-*+]\s+(.+)$", segment)
+                segment_bullet = match_bullet(segment)
                 if segment_bullet:
                     segment_text = segment_bullet.group(1).strip()
                     if segment_text:
-                        rewritten_lines.append(f"- {segment_text}")
+                        append(f"- {segment_text}")
                 elif (
                     rewritten_lines
                     and rewritten_lines[-1].startswith("- Precio:")
-                    and re.match(r"^[\d$€].{2,}$", segment)
+                    and match_price(segment)
                 ):
-                    rewritten_lines.append(f"- Precio: {segment}")
+                    append(f"- Precio: {segment}")
                 elif segment.lower() in {"pros", "contras", "precio", "servicio"}:
                     continue
                 else:
-                    rewritten_lines.append(segment)
+                    append(segment)
             continue
 
         if (
             rewritten_lines
             and rewritten_lines[-1].startswith("- Precio:")
-            and re.match(r"^[\d$€].{2,}$", line)
+            and match_price(line)
         ):
             extra_price = line.strip().rstrip("|").strip()
             if extra_price:
-                rewritten_lines.append(f"- Precio: {extra_price}")
+                append(f"- Precio: {extra_price}")
             continue
 
         line = line.strip("| ").strip()
-        line = re.sub(r"\s+\|\s*$", "", line)
+        line = strip_trailing_pipe("", line)
         if line:
-            rewritten_lines.append(line)
+            append(line)
 
     rewritten = "\n".join(rewritten_lines)
-    rewritten = re.sub(r"\n{3,}", "\n\n", rewritten).strip()
+    rewritten = FORMAT_BLANK_RUN_RE.sub("\n\n", rewritten).strip()
 
     if not rewritten:
         return cleaned
@@ -1371,20 +1630,19 @@ def resolve_user_identity(user_id: str, source: str = "api") -> str:
 def clear_user_history(user_id: str) -> bool:
     """Limpia el historial de un usuario en memoria de sesion."""
     user_id = resolve_user_identity(user_id=user_id, source="telegram")
-    history = conversation_history.get(user_id)
-    had_history = bool(history)
-    if history is None:
-        conversation_history[user_id] = []
-    else:
-        history.clear()
+    roles, contents = conversation_history[user_id]
+    had_history = bool(roles)
+    roles.clear()
+    contents.clear()
     return had_history
 
 
 def clear_all_histories() -> int:
     """Limpia todo el historial de chat en memoria de sesión."""
     sessions = len(conversation_history)
-    for history in conversation_history.values():
-        history.clear()
+    for roles, contents in conversation_history.values():
+        roles.clear()
+        contents.clear()
     conversation_history.clear()
     return sessions
 
@@ -1396,7 +1654,7 @@ async def _build_web_context(
     query_override: str = "",
     prefer_news: bool = False,
 ) -> tuple[str, list[dict[str, str]], str]:
-    """Detecta intencion de busqueda y construye contexto web."""
+    """Detecta intencion de busqueda y construye contexto web (ya sin espacios en los bordes)."""
     if not web_search_engine:
         return "", [], ""
     if not allow_web_search:
@@ -1427,9 +1685,9 @@ async def _build_web_context(
         topic_hint = _infer_topic_hint_from_history(history, message)
         if topic_hint:
             query = f"{topic_hint} datos actuales"
-            logger.info(f"Query web enriquecida por contexto: '{query}'")
+            logger.info("Query web enriquecida por contexto: '%s'", query)
 
-    if re.search(r"\b(precio|cotizaci[oó]n|valor)\b", message_lower):
+    if WEB_PRICE_HINT_RE.search(message_lower):
         if len(query.split()) <= 3 and "precio" not in query and "cotizacion" not in query:
             query = f"precio actual de {query}"
 
@@ -1437,7 +1695,10 @@ async def _build_web_context(
         word in message_lower for word in ("noticias", "news", "actualidad", "hoy")
     )
     logger.info(
-        f"Intencion web detectada. Query='{query}', news={use_news}, prefer_news={prefer_news}"
+        "Intencion web detectada. Query='%s', news=%s, prefer_news=%s",
+        query,
+        use_news,
+        prefer_news,
     )
 
     # Fase 3: escalera anti-fracaso para busqueda web.
@@ -1448,6 +1709,9 @@ async def _build_web_context(
         else ["web_search_general", "web_search_news", "web_search_general"]
     )
 
+    # Si el usuario pide explicitamente datos nuevos, no servimos desde cache.
+    force_refresh = bool(WEB_FOLLOWUP_REFRESH_RE.search(message_lower))
+
     results: list[dict[str, str]] = []
     used_capability = ""
     for capability_id in ladder:
@@ -1455,18 +1719,15 @@ async def _build_web_context(
             continue
         used_capability = capability_id
         try:
-            if capability_id == "web_search_news":
-                results = await web_search_engine.search_news(query, max_results=5)
-            else:
-                results = await web_search_engine.search(query, max_results=5)
+            results = await _cached_web_search(capability_id, query, force_refresh=force_refresh)
         except Exception as exc:
-            logger.warning(f"Fallo en herramienta {capability_id}: {exc}")
+            logger.warning("Fallo en herramienta %s: %s", capability_id, exc)
             results = []
         if results:
             break
 
     if not results:
-        logger.warning(f"Busqueda web sin resultados para query='{query}'")
+        logger.warning("Busqueda web sin resultados para query='%s'", query)
         return query, [], ""
 
     lines = [
@@ -1483,7 +1744,47 @@ async def _build_web_context(
         if url:
             lines.append(f"   Fuente: {url}")
 
-    return query, results, "\n".join(lines)
+    return query, results, "\n".join(lines).rstrip()
+
+
+async def _cached_web_search(
+    capability_id: str,
+    query: str,
+    force_refresh: bool = False,
+) -> list[dict[str, str]]:
+    """Ejecuta la herramienta web pedida sirviendo consultas repetidas desde un cache TTL."""
+    key = (capability_id, query.strip().lower())
+    now = time.monotonic()
+    cached = web_search_cache.get(key)
+    if cached and not force_refresh and cached[0] > now:
+        web_search_cache.move_to_end(key)
+        logger.info("Busqueda web servida desde cache: %s '%s'", capability_id, query)
+        return list(cached[1])
+
+    if capability_id == "web_search_news":
+        results = await web_search_engine.search_news(query, max_results=5)
+        ttl = WEB_NEWS_CACHE_TTL_SECONDS
+    else:
+        results = await web_search_engine.search(query, max_results=5)
+        ttl = WEB_SEARCH_CACHE_TTL_SECONDS
+
+    # Solo cacheamos aciertos: un vacio puede ser un fallo transitorio del proveedor.
+    if results:
+        web_search_cache[key] = (time.monotonic() + ttl, list(results))
+        web_search_cache.move_to_end(key)
+        while len(web_search_cache) > WEB_SEARCH_CACHE_MAX_ENTRIES:
+            web_search_cache.popitem(last=False)
+    else:
+        web_search_cache.pop(key, None)
+    return results
+
+
+async def _search_memory_context(message: str) -> str:
+    """Recupera contexto de memoria larga ya saneado (vacio sin MemoryManager)."""
+    if not memory_manager:
+        return ""
+    context = await memory_manager.search_relevant_context(query=message, n=5)
+    return _sanitize_memory_context(context)
 
 
 async def _try_auto_reminder(message: str) -> Optional[str]:
@@ -1494,6 +1795,11 @@ async def _try_auto_reminder(message: str) -> Optional[str]:
     if not reminder_manager:
         return None
 
+    # Toda peticion de creacion contiene alguno de estos literales; el resto
+    # del chat (la gran mayoria) no pasa por los regex de creacion.
+    if not _has_reminder_keyword(message.lower()):
+        return None
+
     if not _looks_like_reminder_creation_request(message):
         return None
 
@@ -1516,7 +1822,7 @@ async def _try_auto_reminder(message: str) -> Optional[str]:
             logger.info("Se detecto intencion de recordatorio, pero no se pudo parsear fecha.")
         return None
 
-    logger.info(f"Recordatorio creado automaticamente: {reminder['id']}")
+    logger.info("Recordatorio creado automaticamente: %s", reminder["id"])
     reminder_date = reminder.get("datetime", "")
     if reminder_manager and hasattr(reminder_manager, "format_datetime_for_user"):
         reminder_date = reminder_manager.format_datetime_for_user(reminder_date)
@@ -1531,21 +1837,15 @@ async def _try_auto_reminder(message: str) -> Optional[str]:
 def _extract_reminder_delete_query(message: str) -> str:
     """Extrae el texto objetivo a eliminar de una orden natural."""
     cleaned = message.strip()
-    patterns = [
-        r"(?:recordatorio|recordatorios)\s+(?:de|del|para|sobre|que\s+dice|que\s+diga)\s+(.+)$",
-        (
-            r"(?:elimina|eliminar|borra|borrar|quita|quitar|cancela|cancelar|"
-            r"remueve|remover|completa|completar)\s+"
-            r"(?:el|la|los|las|mi|mis|un|una)?\s*"
-            r"(?:recordatorio|recordatorios)?\s*(.+)$"
-        ),
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, cleaned, flags=re.IGNORECASE)
+    for pattern in REMINDER_DELETE_QUERY_RES:
+        match = pattern.search(cleaned)
         if not match:
             continue
-        query = match.group(1).strip(" \t\n\r?¡!.,;:")
-        query = re.sub(r"^(de|del|para|sobre)\s+", "", query, flags=re.IGNORECASE)
+        query = match.group(1).strip(REMINDER_DELETE_QUERY_STRIP_CHARS)
+        # Quita una preposicion inicial sobrante sin pasar por regex.
+        head_and_rest = query.split(maxsplit=1)
+        if len(head_and_rest) == 2 and head_and_rest[0].lower() in REMINDER_DELETE_QUERY_PREFIXES:
+            query = head_and_rest[1]
         if query and query.lower() not in {"recordatorio", "recordatorios"}:
             return query
     return ""
@@ -1781,6 +2081,13 @@ async def _handle_reminder_action(
 
     message_clean = message.strip()
     message_lower = message_clean.lower()
+    # En modo deterministico, sin palabra clave ni recordatorio pendiente no hay accion posible.
+    if (
+        not semantic_mode
+        and not _has_reminder_keyword(message_lower)
+        and not _get_pending_reminder(user_id)
+    ):
+        return None
     if _looks_like_memory_management_request(message_clean):
         return None
 
@@ -1883,17 +2190,17 @@ async def _handle_reminder_action(
             reason = str(exc).strip().lower()
             if reason == "missing_task":
                 parsed_dt = None
-                if hasattr(reminder_manager, "_extract_text_and_datetime"):
+                extract_text_and_datetime = getattr(reminder_manager, "_extract_text_and_datetime", None)
+                if extract_text_and_datetime is not None:
                     try:
-                        _, parsed_dt = reminder_manager._extract_text_and_datetime(message_clean)
+                        _, parsed_dt = extract_text_and_datetime(message_clean)
                     except Exception:
                         parsed_dt = None
 
                 if parsed_dt:
-                    pending_reminder_by_user[user_id] = {
-                        "datetime": parsed_dt.isoformat(),
-                        "created_at": datetime.now().isoformat(),
-                    }
+                    pending_reminder_by_user[user_id] = _new_pending_state(
+                        datetime=parsed_dt.isoformat(),
+                    )
                 return (
                     "Ya tengo la hora del recordatorio, pero me falta para que es. "
                     "Dime la accion. Ejemplo: 'para ir a tomar cafe'."
@@ -2129,12 +2436,15 @@ async def _handle_semantic_memory_purge(
     )
 
 
-def _recent_history_texts(history: Optional[list[dict[str, str]]], max_items: int = 8) -> list[str]:
+def _recent_history_texts(
+    history: Optional[Sequence[dict[str, str]]],
+    max_items: int = 8,
+) -> list[str]:
     """Extrae texto reciente del historial para desambiguar comandos cortos."""
     if not history:
         return []
     texts: list[str] = []
-    for item in history[-max_items:]:
+    for item in islice(history, max(0, len(history) - max_items), None):
         content = str(item.get("content", "")).strip()
         if content:
             texts.append(content)
@@ -2179,21 +2489,15 @@ async def _handle_media_stack_action(
 
     recent_texts = _recent_history_texts(history)
 
-    status_requested = looks_like_media_stack_status_request(message)
-    stop_requested = looks_like_media_stack_stop_request(message) or (
-        looks_like_media_stack_followup_stop_request(message, recent_texts)
-    )
-    start_requested = looks_like_media_stack_start_request(message) or (
-        looks_like_media_stack_followup_start_request(message, recent_texts)
-    )
-
-    action = (forced_action or "").strip().lower()
-    if action == "status":
-        status_requested = True
-    elif action == "stop":
-        stop_requested = True
-    elif action == "start":
-        start_requested = True
+    # El clasificador ya devuelve la accion de mayor prioridad (status > stop > start);
+    # forced_action solo puede sumar otra y gana la de mayor prioridad.
+    requested_actions = {
+        classify_media_stack_intent(message, recent_texts),
+        (forced_action or "").strip().lower(),
+    }
+    status_requested = "status" in requested_actions
+    stop_requested = "stop" in requested_actions
+    start_requested = "start" in requested_actions
 
     if not (status_requested or stop_requested or start_requested):
         semantic = await infer_media_stack_action_semantic(
@@ -2268,16 +2572,17 @@ async def _handle_media_stack_action(
         try:
             success, status, detail = task.result()
             if success:
-                logger.info(f"Arranque de protocolo peliculas completado: {status}")
+                logger.info("Arranque de protocolo peliculas completado: %s", status)
             else:
                 logger.warning(
-                    "Arranque de protocolo peliculas incompleto: "
-                    f"status={status}, detail={truncate_text(detail, max_length=200)}"
+                    "Arranque de protocolo peliculas incompleto: status=%s, detail=%s",
+                    status,
+                    truncate_text(detail, max_length=200),
                 )
         except asyncio.CancelledError:
             logger.info("Tarea de arranque de protocolo peliculas cancelada.")
         except Exception as exc:
-            logger.error(f"Fallo en tarea de arranque de protocolo peliculas: {exc}")
+            logger.error("Fallo en tarea de arranque de protocolo peliculas: %s", exc)
 
     media_stack_start_task.add_done_callback(_on_media_stack_start_done)
 
@@ -2288,6 +2593,32 @@ async def _handle_media_stack_action(
     )
 
 
+async def _persist_turn_memory(
+    history_snapshot: list[dict[str, str]],
+    summary: str,
+    user_id: str,
+    source: str,
+) -> None:
+    """Extrae datos del usuario y guarda el resumen del turno en memoria larga."""
+    if not memory_manager:
+        return
+    await memory_manager.extract_and_store_info(history_snapshot, llm_engine, user_id=user_id)
+    metadata = {"source": source, "user_id": user_id}
+    if summary_write_queue is not None:
+        summary_write_queue.put_nowait((summary, metadata))
+        return
+    await memory_manager.store_conversation_summary(summary, metadata=metadata)
+
+
+def _on_memory_persist_done(task: asyncio.Task) -> None:
+    memory_persist_tasks.discard(task)
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        logger.error("Fallo guardando memoria del turno: %s", exc)
+
+
 async def process_chat_message(
     message: str,
     user_id: str,
@@ -2299,12 +2630,12 @@ async def process_chat_message(
     Flujo principal de chat compartido por API y Telegram.
     """
     user_id = resolve_user_identity(user_id=user_id, source=source)
-    logger.info(f"[{source}] Mensaje de {user_id}: {message[:120]}...")
+    logger.info("[%s] Mensaje de %s: %s...", source, user_id, message[:120])
 
-    history = conversation_history.setdefault(user_id, [])
-    history.append({"role": "user", "content": message})
-    if len(history) > MAX_CONTEXT_MESSAGES:
-        del history[:-MAX_CONTEXT_MESSAGES]
+    turns = conversation_history[user_id]
+    _append_history(turns, "user", message)
+    # Los modulos semanticos recortan con slices; les pasamos una vista en lista.
+    history = _history_messages(turns)
 
     response_text: str
     route_decision = RouteDecision(
@@ -2463,11 +2794,6 @@ async def process_chat_message(
                         )
                         allow_web_search = explicit_web_request or route_requires_web
 
-                        memory_context = ""
-                        if memory_manager:
-                            memory_context = await memory_manager.search_relevant_context(query=message, n=5)
-                            memory_context = _sanitize_memory_context(memory_context)
-
                         temporal_context = ""
                         should_inject_datetime = (
                             has_temporal_reference(message)
@@ -2480,21 +2806,34 @@ async def process_chat_message(
 
                         route_query = str(route_decision.entities.get("query", "")).strip()
                         prefer_news = bool(route_decision.entities.get("prefer_news"))
-                        web_query, web_results, web_context = await _build_web_context(
-                            message,
-                            history=history,
-                            allow_web_search=allow_web_search,
-                            query_override=route_query,
-                            prefer_news=prefer_news,
+                        # Web, memoria (Chroma en un thread) y auto-recordatorio son
+                        # independientes: sus latencias se solapan.
+                        web_outcome, memory_outcome, auto_reminder_outcome = await asyncio.gather(
+                            _build_web_context(
+                                message,
+                                history=history,
+                                allow_web_search=allow_web_search,
+                                query_override=route_query,
+                                prefer_news=prefer_news,
+                            ),
+                            _search_memory_context(message),
+                            _try_auto_reminder(message),
+                            return_exceptions=True,
                         )
+                        if isinstance(web_outcome, Exception):
+                            logger.error("Error construyendo contexto web: %s", web_outcome)
+                            web_outcome = ("", [], "")
+                        web_query, web_results, web_context = web_outcome
+                        if isinstance(memory_outcome, Exception):
+                            logger.error("Error buscando contexto de memoria: %s", memory_outcome)
+                            memory_outcome = ""
+                        memory_context = memory_outcome
+                        if isinstance(auto_reminder_outcome, Exception):
+                            logger.error("Error creando recordatorio automatico: %s", auto_reminder_outcome)
+                            auto_reminder_outcome = None
+                        # Los tres bloques llegan ya recortados desde su origen.
                         combined_context = "\n\n".join(
-                            part
-                            for part in (
-                                memory_context.strip(),
-                                temporal_context.strip(),
-                                web_context.strip(),
-                            )
-                            if part
+                            [part for part in (memory_context, temporal_context, web_context) if part]
                         )
 
                         active_reminders = ""
@@ -2518,13 +2857,8 @@ async def process_chat_message(
                         )
 
                         # Fallback cuando el modelo falle y si tenemos resultados web estructurados.
-                        if web_results and (
-                            not response_text.strip()
-                            or response_text.startswith("Error:")
-                            or response_text.strip().upper() == "NADA"
-                            or len(response_text.strip()) <= 8
-                            or "no pude generar una respuesta" in response_text.lower()
-                        ):
+                        llm_failed = _response_is_empty_or_error(response_text)
+                        if web_results and llm_failed:
                             response_text = _format_web_results_for_user(web_query, web_results, max_results=5)
 
                         # Segundo fallback: si el LLM falla y no hubo contexto web inicial,
@@ -2533,13 +2867,7 @@ async def process_chat_message(
                             web_search_engine
                             and route_requires_web
                             and not web_results
-                            and (
-                                not response_text.strip()
-                                or response_text.startswith("Error:")
-                                or "no pude generar una respuesta" in response_text.lower()
-                                or response_text.strip().upper() == "NADA"
-                                or len(response_text.strip()) <= 8
-                            )
+                            and llm_failed
                         ):
                             rescue_query = _normalize_web_query(message)
                             if rescue_query:
@@ -2585,12 +2913,14 @@ async def process_chat_message(
                             if retry_response.strip() and not _is_generic_refusal(retry_response):
                                 response_text = retry_response
 
-                        auto_reminder_note = await _try_auto_reminder(message)
-                        if auto_reminder_note:
+                        if auto_reminder_outcome:
                             response_text = _remove_reminder_denials(response_text)
-                            response_text = f"{response_text}\n\n{auto_reminder_note}"
+                            response_text = f"{response_text}\n\n{auto_reminder_outcome}"
 
-    response_text = _normalize_response_format(response_text)
+    if len(response_text) > FORMAT_OFFLOAD_THRESHOLD_CHARS:
+        response_text = await asyncio.to_thread(_normalize_response_format, response_text)
+    else:
+        response_text = _normalize_response_format(response_text)
     source_entries = _build_source_entries(web_results)
     latest_web_sources_by_user[user_id] = source_entries
 
@@ -2603,30 +2933,31 @@ async def process_chat_message(
     )
     response_text = verification.response
     if verification.issues:
-        logger.info(f"Respuesta ajustada por verificador: {verification.issues}")
+        logger.info("Respuesta ajustada por verificador: %s", verification.issues)
 
-    history.append({"role": "assistant", "content": response_text})
-    if len(history) > MAX_CONTEXT_MESSAGES:
-        del history[:-MAX_CONTEXT_MESSAGES]
+    _append_history(turns, "assistant", response_text)
 
-    if memory_manager and not skip_memory_autostore and not _is_generic_refusal(response_text):
-        await memory_manager.extract_and_store_info(history, llm_engine, user_id=user_id)
+    is_refusal = _is_generic_refusal(response_text)
+    if memory_manager and not skip_memory_autostore and not is_refusal:
         summary = truncate_text(
             f"Usuario: {message}\nAsistente: {response_text}",
             max_length=900,
         )
-        await memory_manager.store_conversation_summary(
-            summary,
-            metadata={"source": source, "user_id": user_id},
+        # El guardado (incluye una llamada al LLM) no debe retrasar la respuesta.
+        task = asyncio.create_task(
+            _persist_turn_memory(_history_messages(turns), summary, user_id=user_id, source=source),
+            name="memory-persist",
         )
+        memory_persist_tasks.add(task)
+        task.add_done_callback(_on_memory_persist_done)
     elif memory_manager:
         logger.info(
             "No se guardo resumen en memoria: skip=%s generic_refusal=%s",
             skip_memory_autostore,
-            _is_generic_refusal(response_text),
+            is_refusal,
         )
 
-    logger.info(f"[{source}] Respuesta para {user_id}: {response_text[:120]}...")
+    logger.info("[%s] Respuesta para %s: %s...", source, user_id, response_text[:120])
     return response_text
 
 
@@ -2646,19 +2977,51 @@ async def _telegram_supervisor_loop(retry_seconds: int = 20) -> None:
         except asyncio.CancelledError:
             raise
         except Exception as exc:
-            logger.error(f"Error en supervisor de Telegram: {exc}")
+            logger.error("Error en supervisor de Telegram: %s", exc)
+
+
+async def _pending_sweeper_loop(interval_seconds: int = 60) -> None:
+    """Barre periodicamente los estados pendientes expirados (memoria acotada)."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        evicted = _sweep_expired_pending_states()
+        if evicted:
+            logger.info("Estados pendientes expirados descartados: %d", evicted)
+
+
+async def _summary_writer_loop(queue: asyncio.Queue) -> None:
+    """Agrupa resumenes encolados y los guarda con un solo add por lote."""
+    while True:
+        batch = [await queue.get()]
+        while len(batch) < SUMMARY_WRITE_BATCH_SIZE:
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), SUMMARY_WRITE_FLUSH_SECONDS))
+            except asyncio.TimeoutError:
+                break
+        try:
+            if memory_manager:
+                await memory_manager.store_conversation_summaries(batch)
+        except Exception as exc:
+            logger.error("Fallo guardando lote de resumenes (%d): %s", len(batch), exc)
+        finally:
+            for _ in batch:
+                queue.task_done()
 
 
 # --- Lifespan (startup/shutdown) ---
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manejo de inicio y cierre del servidor."""
-    global telegram_bot, telegram_task
+    global telegram_bot, telegram_task, pending_sweeper_task
+    global summary_write_queue, summary_writer_task, llm_warmup_task
 
     logger.info("Iniciando servidor del agente de IA...")
     ollama_ok = await llm_engine.check_health()
     if ollama_ok:
         logger.info("Ollama esta disponible y listo")
+        # Precarga en segundo plano: cargar el modelo puede tardar hasta OLLAMA_TIMEOUT
+        # y no debe retrasar el servidor, Telegram ni el scheduler.
+        llm_warmup_task = asyncio.create_task(llm_engine.warmup(), name="llm-warmup")
     else:
         logger.warning(
             "Ollama NO esta disponible. "
@@ -2683,16 +3046,37 @@ async def lifespan(app: FastAPI):
                 name="telegram-supervisor",
             )
         except Exception as exc:
-            logger.error(f"No se pudo iniciar el bot de Telegram: {exc}")
+            logger.error("No se pudo iniciar el bot de Telegram: %s", exc)
             telegram_bot = None
             telegram_task = None
 
     if reminder_manager:
         reminder_manager.start_scheduler()
 
+    pending_sweeper_task = asyncio.create_task(
+        _pending_sweeper_loop(),
+        name="pending-sweeper",
+    )
+
+    summary_write_queue = asyncio.Queue()
+    summary_writer_task = asyncio.create_task(
+        _summary_writer_loop(summary_write_queue),
+        name="summary-writer",
+    )
+
     try:
         yield
     finally:
+        if llm_warmup_task and not llm_warmup_task.done():
+            llm_warmup_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await llm_warmup_task
+        llm_warmup_task = None
+
+        pending_sweeper_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await pending_sweeper_task
+
         if reminder_manager:
             reminder_manager.stop_scheduler()
 
@@ -2707,6 +3091,22 @@ async def lifespan(app: FastAPI):
         if radarr_client:
             await radarr_client.close()
 
+        if web_search_engine:
+            web_search_engine.close()
+
+        # Dar margen a los guardados de memoria en curso antes de cerrar el cliente LLM.
+        if memory_persist_tasks:
+            await asyncio.wait(set(memory_persist_tasks), timeout=10)
+
+        # Vaciar los resumenes pendientes antes de detener el escritor.
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(summary_write_queue.join(), timeout=10)
+        summary_writer_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await summary_writer_task
+        summary_write_queue = None
+        summary_writer_task = None
+
         await llm_engine.close()
         logger.info("Servidor detenido")
 
@@ -2727,44 +3127,66 @@ _MOVIE_HINT_WEB_RE = re.compile(
     r"busca(?:me)?\s+la\s+peli|peli(?:cula)?|movie)\b",
     flags=re.IGNORECASE,
 )
+_MOVIE_QUOTED_RE = re.compile(r"[\"“”'‘’]([^\"“”'‘’]{2,100})[\"“”'‘’]")
+_MOVIE_VERB_RE = re.compile(
+    r"(?:quiero\s+ver|ver|descarga(?:r)?|baja(?:me)?|"
+    r"pon(?:me)?(?:\s+la\s+peli(?:cula)?)?|"
+    r"busca(?:me)?(?:\s+la\s+peli(?:cula)?)?|movie)\s+(.+)$",
+    flags=re.IGNORECASE,
+)
+_MOVIE_LEAD_ARTICLE_RE = re.compile(
+    r"^(?:(?:la|las|el|los|una|un)\s+)?(?:pel[ií]culas?|pelis?|movie)\s+(?:de\s+)?",
+    flags=re.IGNORECASE,
+)
+# Relleno que sigue al inicio del candidato: el titulo no es confiable (ej: "El Padrino"
+# conserva su articulo y lo decide el LLM).
+_MOVIE_LEAD_FILLER_RE = re.compile(
+    r"^(?:la|las|el|los|una|unas|un|unos|pel[ií]culas?|pelis?|movie)\b",
+    flags=re.IGNORECASE,
+)
+_MOVIE_LEAD_DE_RE = re.compile(r"^de\s+", flags=re.IGNORECASE)
+_MOVIE_POLITENESS_RE = re.compile(r"\b(por\s+favor|pls|please)\b", flags=re.IGNORECASE)
+# Ordenes cortas con estas frases se resuelven sin el extractor LLM.
+_MOVIE_STRONG_CUES = ("quiero ver", "descarga", "bajame")
+_MOVIE_CONFIDENT_MAX_CHARS = 40
+_MOVIE_STRIP_CHARS = " \t\n\r.,!?¿¡:;\"'()[]{}"
 
 
-def _extract_movie_title_heuristic(message: str) -> Optional[str]:
-    """Extrae título con reglas simples cuando el extractor LLM falla."""
+def _extract_movie_title_heuristic(message: str) -> tuple[Optional[str], bool]:
+    """
+    Extrae título con reglas simples. Retorna (titulo, confiable): confiable si
+    venia entre comillas o es una orden corta y directa ("quiero ver X") cuyo
+    candidato ya no empieza con articulo ni "peli".
+    """
     text = (message or "").strip()
     if not text:
-        return None
+        return None, False
 
-    quoted = re.search(r"[\"“”'‘’]([^\"“”'‘’]{2,100})[\"“”'‘’]", text)
+    quoted = _MOVIE_QUOTED_RE.search(text)
     if quoted:
         candidate = quoted.group(1).strip()
         if candidate:
-            return candidate
+            return candidate, True
 
-    pattern = re.compile(
-        r"(?:quiero\s+ver|ver|descarga(?:r)?|baja(?:me)?|"
-        r"pon(?:me)?(?:\s+la\s+peli(?:cula)?)?|"
-        r"busca(?:me)?(?:\s+la\s+peli(?:cula)?)?|movie)\s+(.+)$",
-        flags=re.IGNORECASE,
-    )
-    match = pattern.search(text)
+    match = _MOVIE_VERB_RE.search(text)
     if not match:
-        return None
+        return None, False
 
     candidate = match.group(1).strip()
-    candidate = re.sub(
-        r"^(la|el|una|un)\s+(pel[ií]cula|movie)\s+(de\s+)?",
-        "",
-        candidate,
-        flags=re.IGNORECASE,
-    )
-    candidate = re.sub(r"^de\s+", "", candidate, flags=re.IGNORECASE)
-    candidate = re.sub(r"\b(por\s+favor|pls|please)\b", "", candidate, flags=re.IGNORECASE)
-    candidate = candidate.strip(" \t\n\r.,!?¿¡:;\"'()[]{}")
+    candidate = _MOVIE_LEAD_ARTICLE_RE.sub("", candidate)
+    candidate = _MOVIE_LEAD_DE_RE.sub("", candidate)
+    candidate = _MOVIE_POLITENESS_RE.sub("", candidate)
+    candidate = candidate.strip(_MOVIE_STRIP_CHARS)
 
     if not candidate or len(candidate) > 100:
-        return None
-    return candidate
+        return None, False
+    text_lower = text.lower()
+    confident = (
+        len(text) <= _MOVIE_CONFIDENT_MAX_CHARS
+        and any(cue in text_lower for cue in _MOVIE_STRONG_CUES)
+        and not _MOVIE_LEAD_FILLER_RE.match(candidate)
+    )
+    return candidate, confident
 
 
 async def _extract_movie_title(message: str) -> Optional[str]:
@@ -2772,7 +3194,10 @@ async def _extract_movie_title(message: str) -> Optional[str]:
     if not _MOVIE_HINT_WEB_RE.search(message):
         return None
 
-    heuristic_title = _extract_movie_title_heuristic(message)
+    heuristic_title, heuristic_confident = _extract_movie_title_heuristic(message)
+    # Titulo entre comillas u orden corta y directa: no hace falta gastar una llamada al LLM.
+    if heuristic_confident:
+        return heuristic_title
 
     extraction_prompt = (
         "Eres un extractor de intenciones. El usuario quiere ver o descargar una pelicula.\n"
@@ -2796,7 +3221,7 @@ async def _extract_movie_title(message: str) -> Optional[str]:
             return cleaned
         return heuristic_title
     except Exception as exc:
-        logger.error(f"Error extrayendo título de película: {exc}")
+        logger.error("Error extrayendo título de película: %s", exc)
         return heuristic_title
 
 
@@ -2816,26 +3241,17 @@ async def chat(request: ChatRequest) -> ChatResponse:
         source=request.source,
     )
     latest_web_sources_by_user[resolved_user_id] = []
-    history_preview = conversation_history.get(resolved_user_id, [])
-    recent_texts = _recent_history_texts(history_preview)
-
-    # Detectar intención de película para fuentes web/desktop
-    media_stack_command = (
-        looks_like_media_stack_start_request(request.message)
-        or looks_like_media_stack_followup_start_request(request.message, recent_texts)
-        or looks_like_media_stack_stop_request(request.message)
-        or looks_like_media_stack_followup_stop_request(request.message, recent_texts)
-        or looks_like_media_stack_status_request(request.message)
-    )
+
+    # Detectar intención de película para fuentes web/desktop (salvo ordenes del protocolo).
     if (
         radarr_client
         and radarr_client.enabled
         and request.source in ("desktop", "api")
-        and not media_stack_command
+        and classify_media_stack_intent(request.message, _preview_recent_texts(resolved_user_id)) is None
     ):
         movie_title = await _extract_movie_title(request.message)
         if movie_title:
-            logger.info(f"[{request.source}] Intención de película detectada: '{movie_title}'")
+            logger.info("[%s] Intención de película detectada: '%s'", request.source, movie_title)
             results = await radarr_client.search_movie(movie_title)
             if results:
                 movie = results[0]
@@ -2958,12 +3374,16 @@ async def llm_catalog() -> LLMCatalogResponse:
 # --- Endpoints de películas (Fase 6.5 web) ---
 
 class MovieReleasesRequest(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
     tmdb_id: int
     title: str = ""
     year: int = 0
 
 
 class MovieGrabRequest(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
     guid: str
     indexer_id: int
     tmdb_id: Optional[int] = None
@@ -3126,11 +3546,11 @@ async def radarr_webhook(payload: dict[str, Any]) -> dict[str, str]:
     Configurar en Radarr: Settings > Connect > Webhook > URL: http://<host>:8000/webhook/radarr
     """
     event_type = payload.get("eventType", "Unknown")
-    logger.info(f"Webhook Radarr recibido: eventType={event_type}")
+    logger.info("Webhook Radarr recibido: eventType=%s", event_type)
 
     # Solo procesamos eventos de descarga/importacion completada
     if event_type not in ("Download", "MovieAdded", "MovieFileDelete"):
-        logger.debug(f"Webhook Radarr ignorado: eventType={event_type}")
+        logger.debug("Webhook Radarr ignorado: eventType=%s", event_type)
         return {"status": "ignored", "eventType": event_type}
 
     # Extraer titulo de la pelicula
@@ -3150,9 +3570,9 @@ async def radarr_webhook(payload: dict[str, Any]) -> dict[str, str]:
         if telegram_bot:
             sent = await telegram_bot.send_message(message)
             if sent:
-                logger.info(f"Notificacion Telegram enviada: {title}")
+                logger.info("Notificacion Telegram enviada: %s", title)
             else:
-                logger.warning(f"No se pudo enviar notificacion Telegram para: {title}")
+                logger.warning("No se pudo enviar notificacion Telegram para: %s", title)
         else:
             logger.warning("Bot de Telegram no disponible para notificacion de Radarr.")
 
@@ -3162,43 +3582,93 @@ async def radarr_webhook(payload: dict[str, Any]) -> dict[str, str]:
 
 
 @app.get("/health", response_model=HealthResponse)
-async def health() -> HealthResponse:
+async def health(fresh: bool = False) -> HealthResponse:
     """Verifica el estado del servidor y la conexion a Ollama y Radarr."""
-    ollama_ok = await llm_engine.check_health()
-    radarr_ok = None
-    if radarr_client and radarr_client.enabled:
-        radarr_ok = await radarr_client.check_health()
-    return HealthResponse(status="ok", ollama=ollama_ok, radarr=radarr_ok)
+    global health_cache
+
+    if not fresh and (cached := _cached_health()) is not None:
+        return cached
+
+    async with health_cache_lock:
+        # Otro request pudo refrescar mientras esperabamos el lock.
+        if not fresh and (cached := _cached_health()) is not None:
+            return cached
+        response = await _probe_health()
+        health_cache = (time.monotonic(), response)
+        return response
+
+
+def _cached_health() -> Optional[HealthResponse]:
+    if health_cache is None:
+        return None
+    cached_at, cached = health_cache
+    if time.monotonic() - cached_at >= HEALTH_CACHE_TTL:
+        return None
+    return cached
+
+
+async def _probe_health() -> HealthResponse:
+    """Sondea Ollama y Radarr (si esta habilitado)."""
+    checks = [llm_engine.check_health()]
+    radarr_enabled = bool(radarr_client and radarr_client.enabled)
+    if radarr_enabled:
+        checks.append(radarr_client.check_health())
+    # Sondeos en paralelo: la latencia es la del mas lento, no la suma.
+    results = [
+        result is True
+        for result in await asyncio.gather(*checks, return_exceptions=True)
+    ]
+    radarr_ok = results[1] if radarr_enabled else None
+    return HealthResponse(status="ok", ollama=results[0], radarr=radarr_ok)
 
 
 # --- Servir frontend ---
 @app.get("/")
-async def serve_index():
+async def serve_index(request: Request):
     """Sirve la pagina principal del frontend."""
     index_path = FRONTEND_DIR / "index.html"
-    if index_path.exists():
-        return FileResponse(
-            str(index_path),
-            headers={
-                "Cache-Control": "no-store, no-cache, must-revalidate, max-age=0",
-                "Pragma": "no-cache",
-                "Expires": "0",
-            },
-        )
-    return {"message": "Frontend no disponible. Se habilitara en la Fase 3."}
+    try:
+        index_stat = index_path.stat()
+    except OSError:
+        return {"message": "Frontend no disponible. Se habilitara en la Fase 3."}
+
+    # no-cache (no no-store): el navegador guarda el HTML pero revalida siempre;
+    # si no cambio, responde 304 sin cuerpo.
+    etag = f'W/"{int(index_stat.st_mtime)}-{index_stat.st_size}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(str(index_path), stat_result=index_stat, headers=headers)
 
 
 if FRONTEND_DIR.exists():
-    app.mount("/static", StaticFiles(directory=str(FRONTEND_DIR)), name="static")
+    app.mount("/static", FrontendStaticFiles(directory=str(FRONTEND_DIR)), name="static")
 
 
 # --- Punto de entrada ---
 if __name__ == "__main__":
-    logger.info(f"Iniciando servidor en http://{HOST}:{PORT}")
+    # uvloop/httptools vienen con uvicorn[standard]; si faltan, caemos a asyncio/h11.
+    loop_impl = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http_impl = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    # reload y multiples workers son incompatibles: en desarrollo un solo proceso.
+    workers = 1 if RELOAD else WORKERS
+    logger.info(
+        "Iniciando servidor en http://%s:%s (loop=%s, http=%s, workers=%d)",
+        HOST,
+        PORT,
+        loop_impl,
+        http_impl,
+        workers,
+    )
     uvicorn.run(
-        "app.main:app" if RELOAD else app,
+        "app.main:app" if RELOAD or workers > 1 else app,
         host=HOST,
         port=PORT,
         reload=RELOAD,
+        workers=workers,
+        loop=loop_impl,
+        http=http_impl,
+        limit_concurrency=LIMIT_CONCURRENCY,
+        timeout_keep_alive=TIMEOUT_KEEP_ALIVE,
         log_level="info",
     )
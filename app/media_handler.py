@@ -5,12 +5,51 @@ Fase 7: Descarga y notificación vía webhook.
 Fase 6.5: Selección de calidad (4K, 1080p, etc.) antes de descargar.
 """
 
+import asyncio
+import heapq
 import httpx
+import importlib.util
 import re
-from typing import Any, Optional
+import time
+from functools import lru_cache
+from operator import itemgetter
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Mapping, Optional
 
 from app.config import RADARR_URL, RADARR_API_KEY, logger
 
+try:
+    from orjson import dumps as _json_dumps, loads as _json_loads
+except ImportError:
+    import json
+
+    _json_loads = json.loads
+
+    def _json_dumps(value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+# httpx serializa `json=` con json stdlib; enviamos el body ya serializado.
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Pool keep-alive compartido por todas las llamadas a Radarr; holgado para las
+# búsquedas de releases concurrentes (cada una puede tardar decenas de segundos).
+RADARR_HTTP_LIMITS = httpx.Limits(
+    max_keepalive_connections=50,
+    max_connections=200,
+    keepalive_expiry=120.0,
+)
+# httpx solo negocia HTTP/2 por TLS (ALPN) y requiere el paquete h2; con
+# Radarr en http:// local sigue usando HTTP/1.1 sobre el pool keep-alive.
+RADARR_HTTP2 = importlib.util.find_spec("h2") is not None
+RADARR_CONNECT_TIMEOUT = 5.0
+# Fallos esperables de una llamada a Radarr: red/HTTP, URL mal configurada o JSON inválido
+# (orjson.JSONDecodeError hereda de ValueError). El resto son bugs y deben propagarse.
+_RADARR_ERRORS = (httpx.HTTPError, httpx.InvalidURL, ValueError)
+# /health debe fallar rápido si Radarr está degradado.
+RADARR_HEALTH_TIMEOUT = 2.0
+# Root folders y quality profiles casi nunca cambian: add_movie los reutiliza este tiempo.
+RADARR_DEFAULTS_CACHE_SECONDS = 300.0
+
 
 def _format_size(size_bytes: int) -> str:
     """Convierte bytes a formato legible (GB/MB)."""
@@ -23,17 +62,28 @@ def _format_size(size_bytes: int) -> str:
     return f"{mb:.0f} MB"
 
 
+# En orden de prioridad: un nombre con varias marcas se queda con la más alta.
+_QUALITY_CATEGORY_PATTERNS: tuple[tuple[re.Pattern[str], str], ...] = (
+    (re.compile(r"2160|4k|uhd", re.IGNORECASE), "4K"),
+    (re.compile(r"1080"), "1080p"),
+    (re.compile(r"720"), "720p"),
+    (re.compile(r"480|sd|dvd", re.IGNORECASE), "480p"),
+)
+
+
+_QUALITY_ORDER = ("4K", "1080p", "720p", "480p")
+# Default de solo lectura para `.get(...)` anidados: evita crear un dict vacío por release.
+_EMPTY_MAPPING: Mapping[str, Any] = MappingProxyType({})
+_RELEASE_RANK_KEY = itemgetter("seeders", "size")
+
+
+@lru_cache(maxsize=128)
 def _classify_quality(quality_name: str) -> str:
     """Clasifica un nombre de calidad en una categoría simplificada."""
-    q = quality_name.lower()
-    if any(tag in q for tag in ("2160", "4k", "uhd")):
-        return "4K"
-    if any(tag in q for tag in ("1080",)):
-        return "1080p"
-    if any(tag in q for tag in ("720",)):
-        return "720p"
-    if any(tag in q for tag in ("480", "sd", "dvd")):
-        return "480p"
+    # Radarr repite un puñado de nombres (Bluray-1080p, WEBDL-2160p...): se cachea.
+    for pattern, category in _QUALITY_CATEGORY_PATTERNS:
+        if pattern.search(quality_name):
+            return category
     return quality_name
 
 
@@ -112,6 +162,69 @@ def _short_summary(text: str, max_len: int = 170) -> str:
     return f"{cleaned[:max_len].rstrip()}..."
 
 
+_POSTER_KEYS = ("remotePoster", "remotePosterUrl", "posterUrl", "poster")
+
+
+def _poster_url(item: dict[str, Any], base_url: str) -> str:
+    """Extrae la URL de poster con fallback robusto."""
+    get = item.get
+    poster_url = ""
+    for key in _POSTER_KEYS:
+        candidate = get(key, "")
+        if isinstance(candidate, str) and candidate.strip():
+            poster_url = candidate.strip()
+            break
+
+    if poster_url.startswith("/"):
+        return f"{base_url}{poster_url}"
+    if poster_url:
+        return poster_url
+
+    # Fallback: buscar en images[]
+    for img in get("images", ()):
+        if img.get("coverType") != "poster":
+            continue
+        candidate = img.get("remoteUrl") or img.get("url") or ""
+        if not candidate:
+            continue
+        if isinstance(candidate, str) and candidate.startswith("/"):
+            candidate = f"{base_url}{candidate}"
+        return candidate
+
+    # Fallback final: construir URL pública de TMDB si existe posterPath.
+    poster_path = get("posterPath") or get("remotePosterPath")
+    if isinstance(poster_path, str) and poster_path.startswith("/"):
+        return f"https://image.tmdb.org/t/p/w500{poster_path}"
+    return ""
+
+
+def _movie_result(item: dict[str, Any], base_url: str) -> dict[str, Any]:
+    """Convierte un resultado de /movie/lookup en la tarjeta que usan UI y Telegram."""
+    get = item.get
+    genres = _extract_genres(get("genres"))
+    runtime_minutes = _extract_runtime_minutes(item)
+    overview = (get("overview") or "").strip()
+    return {
+        "title": get("title", "Desconocido"),
+        "year": get("year", 0),
+        "tmdbId": get("tmdbId", 0),
+        "overview": overview[:400],
+        "summary": _short_summary(overview),
+        "poster_url": _poster_url(item, base_url),
+        "genres": genres,
+        "genre_text": ", ".join(genres) if genres else "No especificado",
+        "runtime_minutes": runtime_minutes,
+        "runtime_text": _format_runtime(runtime_minutes),
+        "hasFile": get("hasFile", False),
+        "isExisting": get("id", 0) > 0,
+    }
+
+
+async def _no_fetch() -> list[dict[str, Any]]:
+    """Resultado vacío para las consultas que no hace falta lanzar."""
+    return []
+
+
 class RadarrClient:
     """Gestiona la comunicación con la API de Radarr."""
 
@@ -125,6 +238,11 @@ class RadarrClient:
         self.api_key = api_key
         self.timeout = timeout
         self._client: Optional[httpx.AsyncClient] = None
+        self._client_lock = asyncio.Lock()
+        # endpoint -> (monotonic, datos); solo se guardan respuestas no vacías.
+        self._defaults_cache: dict[str, tuple[float, list[dict[str, Any]]]] = {}
+        # Un lock por endpoint: add_movie pide ambos en paralelo.
+        self._defaults_locks: dict[str, asyncio.Lock] = {}
 
         if not self.api_key:
             logger.warning("RADARR_API_KEY no configurada. RadarrClient deshabilitado.")
@@ -136,18 +254,26 @@ class RadarrClient:
 
     async def _get_client(self) -> httpx.AsyncClient:
         """Retorna o crea el cliente HTTP reutilizable."""
-        if self._client is None or self._client.is_closed:
-            self._client = httpx.AsyncClient(
-                base_url=self.base_url,
-                headers={"X-Api-Key": self.api_key},
-                timeout=self.timeout,
-            )
-        return self._client
+        client = self._client
+        if client is not None and not client.is_closed:
+            return client
+        # El lock evita que corutinas concurrentes creen clientes (y pools) duplicados.
+        async with self._client_lock:
+            if self._client is None or self._client.is_closed:
+                self._client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    headers={"X-Api-Key": self.api_key},
+                    timeout=httpx.Timeout(self.timeout, connect=RADARR_CONNECT_TIMEOUT),
+                    limits=RADARR_HTTP_LIMITS,
+                    http2=RADARR_HTTP2,
+                )
+            return self._client
 
     async def close(self) -> None:
         """Cierra el cliente HTTP."""
-        if self._client and not self._client.is_closed:
-            await self._client.aclose()
+        async with self._client_lock:
+            if self._client and not self._client.is_closed:
+                await self._client.aclose()
             self._client = None
 
     async def check_health(self) -> bool:
@@ -156,7 +282,10 @@ class RadarrClient:
             return False
         try:
             client = await self._get_client()
-            resp = await client.get("/api/v3/health")
+            # HEAD evita transferir la lista de avisos; si Radarr no lo acepta, GET.
+            resp = await client.head("/api/v3/health", timeout=RADARR_HEALTH_TIMEOUT)
+            if resp.status_code in (405, 501):
+                resp = await client.get("/api/v3/health", timeout=RADARR_HEALTH_TIMEOUT)
             return resp.status_code == 200
         except Exception as exc:
             logger.error(f"Error al verificar salud de Radarr: {exc}")
@@ -183,71 +312,16 @@ class RadarrClient:
                 params={"term": query},
             )
             resp.raise_for_status()
-            raw_results = resp.json()
+            raw_results = _json_loads(resp.content)
         except httpx.HTTPStatusError as exc:
             logger.error(f"Error HTTP en búsqueda Radarr: {exc.response.status_code}")
             return []
-        except Exception as exc:
+        except _RADARR_ERRORS as exc:
             logger.error(f"Error en búsqueda Radarr: {exc}")
             return []
 
-        movies: list[dict[str, Any]] = []
-        for item in raw_results[:5]:
-            # Extraer URL de poster con fallback robusto.
-            poster_url = ""
-            poster_candidates = [
-                item.get("remotePoster", ""),
-                item.get("remotePosterUrl", ""),
-                item.get("posterUrl", ""),
-                item.get("poster", ""),
-            ]
-            for candidate in poster_candidates:
-                if isinstance(candidate, str) and candidate.strip():
-                    poster_url = candidate.strip()
-                    break
-
-            if poster_url.startswith("/"):
-                poster_url = f"{self.base_url}{poster_url}"
-
-            if not poster_url:
-                # Fallback: buscar en images[]
-                for img in item.get("images", []):
-                    if img.get("coverType") != "poster":
-                        continue
-                    candidate = img.get("remoteUrl") or img.get("url") or ""
-                    if not candidate:
-                        continue
-                    if isinstance(candidate, str) and candidate.startswith("/"):
-                        candidate = f"{self.base_url}{candidate}"
-                    poster_url = candidate
-                    if poster_url:
-                        break
-
-            # Fallback final: construir URL pública de TMDB si existe posterPath.
-            if not poster_url:
-                poster_path = item.get("posterPath") or item.get("remotePosterPath")
-                if isinstance(poster_path, str) and poster_path.startswith("/"):
-                    poster_url = f"https://image.tmdb.org/t/p/w500{poster_path}"
-
-            genres = _extract_genres(item.get("genres"))
-            runtime_minutes = _extract_runtime_minutes(item)
-            overview = (item.get("overview") or "").strip()
-            summary = _short_summary(overview)
-
-            movies.append({
-                "title": item.get("title", "Desconocido"),
-                "year": item.get("year", 0),
-                "tmdbId": item.get("tmdbId", 0),
-                "overview": overview[:400],
-                "summary": summary,
-                "poster_url": poster_url,
-                "genres": genres,
-                "genre_text": ", ".join(genres) if genres else "No especificado",
-                "runtime_minutes": runtime_minutes,
-                "runtime_text": _format_runtime(runtime_minutes),
-                "hasFile": item.get("hasFile", False),
-                "isExisting": item.get("id", 0) > 0,
-            })
+        base_url = self.base_url
+        movies = [_movie_result(item, base_url) for item in raw_results[:5]]
 
         logger.info(f"Búsqueda Radarr para '{query}': {len(movies)} resultados.")
         return movies
@@ -260,8 +334,8 @@ class RadarrClient:
             client = await self._get_client()
             resp = await client.get("/api/v3/rootfolder")
             resp.raise_for_status()
-            return resp.json()
-        except Exception as exc:
+            return _json_loads(resp.content)
+        except _RADARR_ERRORS as exc:
             logger.error(f"Error al obtener root folders de Radarr: {exc}")
             return []
 
@@ -273,11 +347,41 @@ class RadarrClient:
             client = await self._get_client()
             resp = await client.get("/api/v3/qualityprofile")
             resp.raise_for_status()
-            return resp.json()
-        except Exception as exc:
+            return _json_loads(resp.content)
+        except _RADARR_ERRORS as exc:
             logger.error(f"Error al obtener quality profiles de Radarr: {exc}")
             return []
 
+    async def _cached_defaults(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[list[dict[str, Any]]]],
+    ) -> list[dict[str, Any]]:
+        """Retorna `fetch()` cacheado RADARR_DEFAULTS_CACHE_SECONDS."""
+        cached = self._defaults_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < RADARR_DEFAULTS_CACHE_SECONDS:
+            return cached[1]
+        async with self._defaults_locks.setdefault(key, asyncio.Lock()):
+            cached = self._defaults_cache.get(key)
+            if cached is not None and time.monotonic() - cached[0] < RADARR_DEFAULTS_CACHE_SECONDS:
+                return cached[1]
+            data = await fetch()
+            if data:
+                self._defaults_cache[key] = (time.monotonic(), data)
+            return data
+
+    async def get_root_folders_cached(self) -> list[dict[str, Any]]:
+        """Root folders con cache TTL (para auto-detección en add_movie)."""
+        return await self._cached_defaults("rootfolder", self.get_root_folders)
+
+    async def get_quality_profiles_cached(self) -> list[dict[str, Any]]:
+        """Quality profiles con cache TTL (para auto-detección en add_movie)."""
+        return await self._cached_defaults("qualityprofile", self.get_quality_profiles)
+
+    def invalidate_defaults_cache(self) -> None:
+        """Descarta root folders/quality profiles cacheados."""
+        self._defaults_cache.clear()
+
     async def add_movie(
         self,
         tmdb_id: int,
@@ -324,17 +428,19 @@ class RadarrClient:
             }
 
         try:
-            # Auto-detectar root_folder si no se proporcionó
+            # Auto-detectar root_folder y quality profile en paralelo (un solo RTT).
+            folders, profiles = await asyncio.gather(
+                self.get_root_folders_cached() if not root_folder_path else _no_fetch(),
+                self.get_quality_profiles_cached() if not quality_profile_id else _no_fetch(),
+            )
+
             if not root_folder_path:
-                folders = await self.get_root_folders()
                 if not folders:
                     return {"error": "No hay carpetas raíz configuradas en Radarr."}
                 root_folder_path = folders[0].get("path", "/movies")
                 logger.info(f"Root folder auto-detectado: {root_folder_path}")
 
-            # Auto-detectar quality profile si no se proporcionó
             if not quality_profile_id:
-                profiles = await self.get_quality_profiles()
                 if not profiles:
                     return {"error": "No hay perfiles de calidad configurados en Radarr."}
                 quality_profile_id = profiles[0].get("id", 1)
@@ -356,9 +462,13 @@ class RadarrClient:
             }
 
             client = await self._get_client()
-            resp = await client.post("/api/v3/movie", json=payload)
+            resp = await client.post(
+                "/api/v3/movie",
+                content=_json_dumps(payload),
+                headers=_JSON_HEADERS,
+            )
             resp.raise_for_status()
-            result = resp.json()
+            result = _json_loads(resp.content)
 
             logger.info(
                 f"Película añadida a Radarr: {title} (tmdbId={tmdb_id}, "
@@ -377,7 +487,7 @@ class RadarrClient:
             status = exc.response.status_code
             detail = ""
             try:
-                body = exc.response.json()
+                body = _json_loads(exc.response.content)
                 if isinstance(body, list) and body:
                     detail = body[0].get("errorMessage", "")
                 elif isinstance(body, dict):
@@ -398,6 +508,8 @@ class RadarrClient:
                     "message": "La película ya está en tu biblioteca de Radarr.",
                 }
 
+            # La carpeta o el perfil cacheados pueden haber cambiado en Radarr.
+            self.invalidate_defaults_cache()
             logger.error(f"Error HTTP al añadir película: {status} - {detail}")
             return {"error": f"Error de Radarr ({status}): {detail or 'Error desconocido'}"}
 
@@ -422,7 +534,7 @@ class RadarrClient:
             client = await self._get_client()
             resp = await client.get("/api/v3/movie", params={"tmdbId": tmdb_id})
             resp.raise_for_status()
-            movies = resp.json()
+            movies = _json_loads(resp.content)
             if movies and isinstance(movies, list):
                 return movies[0]
             return None
@@ -445,9 +557,13 @@ class RadarrClient:
             return {"error": "Falta el ID de la película."}
         try:
             client = await self._get_client()
-            resp = await client.put(f"/api/v3/movie/{movie_id}", json=movie_data)
+            resp = await client.put(
+                f"/api/v3/movie/{movie_id}",
+                content=_json_dumps(movie_data),
+                headers=_JSON_HEADERS,
+            )
             resp.raise_for_status()
-            result = resp.json()
+            result = _json_loads(resp.content)
             logger.info(
                 f"Película actualizada en Radarr: {result.get('title', '?')} "
                 f"(radarrId={movie_id}, monitored={result.get('monitored')})"
@@ -489,56 +605,63 @@ class RadarrClient:
                 timeout=60.0,  # La búsqueda puede tardar
             )
             resp.raise_for_status()
-            raw = resp.json()
+            raw = _json_loads(resp.content)
         except httpx.HTTPStatusError as exc:
             logger.error(f"Error HTTP buscando releases: {exc.response.status_code}")
             return []
-        except Exception as exc:
+        except _RADARR_ERRORS as exc:
             logger.error(f"Error buscando releases para movieId={movie_id}: {exc}")
             return []
 
         releases: list[dict[str, Any]] = []
+        approved = 0
         for item in raw:
-            quality_info = item.get("quality", {}).get("quality", {})
+            get = item.get
+            quality_info = get("quality", _EMPTY_MAPPING).get("quality", _EMPTY_MAPPING)
             quality_name = quality_info.get("name", "Desconocida")
             resolution = quality_info.get("resolution", 0)
 
             # Extraer info de idiomas
             languages = [
-                lang.get("name", "")
-                for lang in item.get("languages", [])
-                if lang.get("name")
+                name
+                for lang in get("languages", ())
+                if (name := lang.get("name"))
             ]
 
             # Detectar características especiales
             custom_formats = [
-                cf.get("name", "")
-                for cf in item.get("customFormats", [])
-                if cf.get("name")
+                name
+                for cf in get("customFormats", ())
+                if (name := cf.get("name"))
             ]
 
+            rejected = bool(get("rejected", False))
+            # Enteros garantizados (Radarr manda null en nzb): get_grouped_releases ordena por ellos.
+            size = get("size") or 0
+            approved += not rejected
+
             releases.append({
-                "title": item.get("title", ""),
+                "title": get("title", ""),
                 "quality": quality_name,
                 "quality_category": _classify_quality(quality_name),
                 "resolution": resolution,
-                "size": item.get("size", 0),
-                "size_formatted": _format_size(item.get("size", 0)),
-                "seeders": item.get("seeders", 0),
-                "leechers": item.get("leechers", 0),
-                "indexer": item.get("indexer", "Desconocido"),
-                "guid": item.get("guid", ""),
-                "indexerId": item.get("indexerId", 0),
+                "size": size,
+                "size_formatted": _format_size(size),
+                "seeders": get("seeders") or 0,
+                "leechers": get("leechers", 0),
+                "indexer": get("indexer", "Desconocido"),
+                "guid": get("guid", ""),
+                "indexerId": get("indexerId", 0),
                 "languages": languages,
                 "custom_formats": custom_formats,
-                "rejected": bool(item.get("rejected", False)),
-                "rejections": item.get("rejections", []),
-                "protocol": item.get("protocol", "unknown"),
+                "rejected": rejected,
+                "rejections": get("rejections", []),
+                "protocol": get("protocol", "unknown"),
             })
 
         logger.info(
             f"Releases encontrados para movieId={movie_id}: "
-            f"{len(releases)} total, {len([r for r in releases if not r['rejected']])} aprobados"
+            f"{len(releases)} total, {approved} aprobados"
         )
         return releases
 
@@ -564,25 +687,15 @@ class RadarrClient:
             cat = rel["quality_category"]
             groups.setdefault(cat, []).append(rel)
 
-        # Orden de prioridad
-        quality_order = ["4K", "1080p", "720p", "480p"]
+        # Orden de prioridad; luego las categorías no estándar en orden alfabético.
+        category_order = [cat for cat in _QUALITY_ORDER if cat in groups]
+        category_order += sorted(cat for cat in groups if cat not in _QUALITY_ORDER)
         result: list[dict[str, Any]] = []
 
-        for cat in quality_order:
-            candidates = groups.pop(cat, [])
-            if not candidates:
-                continue
-            # Ordenar por seeders (desc) y luego por tamaño (desc para mejor calidad)
-            candidates.sort(key=lambda r: (r.get("seeders", 0), r.get("size", 0)), reverse=True)
-            for pick in candidates[:max_per_group]:
-                result.append(pick)
-
-        # Añadir categorías restantes no estándar
-        for cat in sorted(groups.keys()):
-            candidates = groups[cat]
-            candidates.sort(key=lambda r: (r.get("seeders", 0), r.get("size", 0)), reverse=True)
-            for pick in candidates[:max_per_group]:
-                result.append(pick)
+        for cat in category_order:
+            # Top-K por seeders (desc) y luego por tamaño (desc para mejor calidad);
+            # nlargest evita ordenar todo el grupo cuando K es chico.
+            result.extend(heapq.nlargest(max_per_group, groups[cat], key=_RELEASE_RANK_KEY))
 
         return result
 
@@ -594,7 +707,7 @@ class RadarrClient:
             client = await self._get_client()
             resp = await client.get("/api/v3/movie")
             resp.raise_for_status()
-            return resp.json()
+            return _json_loads(resp.content)
         except Exception as exc:
             logger.error(f"Error al obtener todas las películas de Radarr: {exc}")
             return []
@@ -692,7 +805,11 @@ class RadarrClient:
                 "guid": guid,
                 "indexerId": indexer_id,
             }
-            resp = await client.post("/api/v3/release", json=payload)
+            resp = await client.post(
+                "/api/v3/release",
+                content=_json_dumps(payload),
+                headers=_JSON_HEADERS,
+            )
             resp.raise_for_status()
 
             logger.info(f"Release grabado exitosamente: guid={guid[:50]}...")
@@ -701,7 +818,7 @@ class RadarrClient:
         except httpx.HTTPStatusError as exc:
             detail = ""
             try:
-                body = exc.response.json()
+                body = _json_loads(exc.response.content)
                 if isinstance(body, dict):
                     detail = body.get("message", "")
                 elif isinstance(body, list) and body:
@@ -711,6 +828,6 @@ class RadarrClient:
             logger.error(f"Error HTTP al grabar release: {exc.response.status_code} - {detail}")
             return {"error": f"Error de Radarr ({exc.response.status_code}): {detail or 'Error desconocido'}"}
 
-        except Exception as exc:
+        except _RADARR_ERRORS as exc:
             logger.error(f"Error al grabar release: {exc}")
             return {"error": f"Error de conexión: {exc}"}
@@ -105,6 +105,12 @@ _NEGATED_STOP_RE = re.compile(
 )
 
 
+_MOVIE_ON_COMMAND_RE = re.compile(r"^\s*/movie_on\s*$", flags=re.IGNORECASE)
+_MOVIE_STATUS_COMMAND_RE = re.compile(r"^\s*/movie_status\s*$", flags=re.IGNORECASE)
+_MOVIE_OFF_COMMAND_RE = re.compile(r"^\s*/movie_off\s*$", flags=re.IGNORECASE)
+_WORD_TOKEN_RE = re.compile(r"[a-zA-Z0-9áéíóúñü]+")
+
+
 class MediaStackSemanticDecision(BaseModel):
     """Salida estructurada para clasificador semántico del stack multimedia."""
 
@@ -139,7 +145,7 @@ def looks_like_media_stack_start_request(message: str) -> bool:
     if not text:
         return False
 
-    if re.match(r"^\s*/movie_on\s*$", text, flags=re.IGNORECASE):
+    if _MOVIE_ON_COMMAND_RE.match(text):
         return True
     if _NEGATED_START_RE.search(text):
         return False
@@ -151,7 +157,7 @@ def looks_like_media_stack_status_request(message: str) -> bool:
     text = (message or "").strip()
     if not text:
         return False
-    if re.match(r"^\s*/movie_status\s*$", text, flags=re.IGNORECASE):
+    if _MOVIE_STATUS_COMMAND_RE.match(text):
         return True
     return bool(_MEDIA_STATUS_RE.search(text))
 
@@ -162,7 +168,7 @@ def looks_like_media_stack_stop_request(message: str) -> bool:
     if not text:
         return False
 
-    if re.match(r"^\s*/movie_off\s*$", text, flags=re.IGNORECASE):
+    if _MOVIE_OFF_COMMAND_RE.match(text):
         return True
     if _NEGATED_STOP_RE.search(text):
         return False
@@ -213,7 +219,7 @@ def looks_like_media_stack_semantic_candidate(
     if _SHORT_IMPERATIVE_RE.match(text):
         return True
 
-    token_count = len(re.findall(r"[a-zA-Z0-9áéíóúñü]+", text))
+    token_count = len(_WORD_TOKEN_RE.findall(text))
     return token_count <= 10 and bool(_MEDIA_SEMANTIC_ACTION_HINT_RE.search(text))
 
 
@@ -250,6 +256,27 @@ def looks_like_media_stack_followup_stop_request(
     return _has_recent_media_stack_context(recent_messages)
 
 
+def classify_media_stack_intent(
+    message: str,
+    recent_messages: Optional[list[str]] = None,
+) -> Optional[str]:
+    """
+    Clasifica la orden determinista del protocolo: status | stop | start | None.
+    Respeta la prioridad de ejecucion y corta en el primer detector que acierta.
+    """
+    if looks_like_media_stack_status_request(message):
+        return "status"
+    if looks_like_media_stack_stop_request(message) or looks_like_media_stack_followup_stop_request(
+        message, recent_messages
+    ):
+        return "stop"
+    if looks_like_media_stack_start_request(message) or looks_like_media_stack_followup_start_request(
+        message, recent_messages
+    ):
+        return "start"
+    return None
+
+
 async def infer_media_stack_action_semantic(
     message: str,
     recent_messages: Optional[list[str]],
@@ -3,6 +3,7 @@ Sistema de memoria con ChromaDB y embeddings de Ollama.
 Permite al agente recordar informacion del usuario entre sesiones.
 """
 
+import asyncio
 import hashlib
 import re
 import time
@@ -635,14 +636,21 @@ class MemoryManager:
         Busca contexto relevante en ambas colecciones.
         Retorna un texto formateado con la informacion encontrada.
         """
+        # El embedding (HTTP sincrono a Ollama) y la consulta a Chroma bloquean;
+        # en un thread no frenan el event loop ni la busqueda web en paralelo.
+        return await asyncio.to_thread(self._search_relevant_context_sync, query, n)
+
+    def _search_relevant_context_sync(self, query: str, n: int) -> str:
+        """Busqueda sincrona de contexto (se ejecuta en thread)."""
         context_parts = []
 
         try:
             # Buscar en perfil del usuario
-            if self.user_profile.count() > 0:
+            profile_count = self.user_profile.count()
+            if profile_count > 0:
                 profile_results = self.user_profile.query(
                     query_texts=[query],
-                    n_results=min(n, self.user_profile.count())
+                    n_results=min(n, profile_count)
                 )
                 if profile_results and profile_results["documents"][0]:
                     context_parts.append("Datos del usuario:")
@@ -650,10 +658,11 @@ class MemoryManager:
                         context_parts.append(f"  - {doc}")
 
             # Buscar en conversaciones
-            if self.conversations.count() > 0:
+            conversations_count = self.conversations.count()
+            if conversations_count > 0:
                 conv_results = self.conversations.query(
                     query_texts=[query],
-                    n_results=min(n, self.conversations.count())
+                    n_results=min(n, conversations_count)
                 )
                 if conv_results and conv_results["documents"][0]:
                     context_parts.append("Conversaciones previas relevantes:")
@@ -725,29 +734,47 @@ class MemoryManager:
         metadata: Optional[dict] = None
     ) -> bool:
         """Guarda un resumen de conversacion."""
-        try:
-            doc_id = hashlib.md5(
-                f"conv_{summary}_{time.time()}".encode()
-            ).hexdigest()
+        return await self.store_conversation_summaries([(summary, metadata)]) == 1
 
-            meta = {
-                "timestamp": time.time(),
-                "type": "conversation_summary"
-            }
-            if metadata:
-                meta.update(metadata)
-
-            self.conversations.add(
-                documents=[summary],
-                ids=[doc_id],
-                metadatas=[meta]
+    async def store_conversation_summaries(
+        self,
+        items: list[tuple[str, Optional[dict]]]
+    ) -> int:
+        """
+        Guarda varios resumenes con un solo add en Chroma (un batch de embeddings).
+        Retorna cuantos se guardaron.
+        """
+        if not items:
+            return 0
+        try:
+            now = time.time()
+            documents: list[str] = []
+            ids: list[str] = []
+            metadatas: list[dict] = []
+            for index, (summary, metadata) in enumerate(items):
+                documents.append(summary)
+                ids.append(hashlib.md5(f"conv_{summary}_{now}_{index}".encode()).hexdigest())
+                meta = {
+                    "timestamp": now,
+                    "type": "conversation_summary"
+                }
+                if metadata:
+                    meta.update(metadata)
+                metadatas.append(meta)
+
+            # El embedding es HTTP sincrono a Ollama: fuera del event loop.
+            await asyncio.to_thread(
+                self.conversations.add,
+                documents=documents,
+                ids=ids,
+                metadatas=metadatas,
             )
-            logger.info(f"Resumen de conversacion guardado: {summary[:80]}...")
-            return True
+            logger.info("Resumenes de conversacion guardados: %d", len(documents))
+            return len(documents)
 
         except Exception as e:
             logger.error(f"Error al guardar resumen: {e}")
-            return False
+            return 0
 
     async def extract_and_store_info(
         self,
@@ -0,0 +1,90 @@
+"""
+StaticFiles del frontend con cache HTTP y variantes precomprimidas.
+
+- URLs versionadas (`/static/app.js?v=...`): cache inmutable de un año;
+  al cambiar el asset se cambia el `?v=` en index.html.
+- Sin version: `no-cache`, el navegador revalida con ETag/Last-Modified (304).
+- Si existe `app.js.br` o `app.js.gz` junto al original y el cliente lo acepta,
+  se sirve esa variante con Content-Encoding (ej: `gzip -k -9 frontend/app.js`).
+"""
+
+import os
+from mimetypes import guess_type
+from typing import Optional
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers, QueryParams
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+
+VERSIONED_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+# Preferencia de codificacion: brotli comprime mejor que gzip.
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _accepted_encodings(accept_encoding: str) -> set[str]:
+    """Codificaciones aceptadas por el cliente (descarta las marcadas con q=0)."""
+    accepted: set[str] = set()
+    for part in accept_encoding.split(","):
+        token, _, params = part.partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = params.strip().lower().replace(" ", "")
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(token)
+    return accepted
+
+
+class FrontendStaticFiles(StaticFiles):
+    """StaticFiles con Cache-Control por version y negociacion de .br/.gz."""
+
+    def file_response(
+        self,
+        full_path: str,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        media_type = guess_type(str(full_path))[0] or "text/plain"
+
+        encoding: Optional[str] = None
+        accepted = _accepted_encodings(request_headers.get("accept-encoding", ""))
+        if accepted:
+            for candidate, suffix in PRECOMPRESSED_ENCODINGS:
+                if candidate not in accepted:
+                    continue
+                try:
+                    compressed_stat = os.stat(f"{full_path}{suffix}")
+                except OSError:
+                    continue
+                full_path = f"{full_path}{suffix}"
+                stat_result = compressed_stat
+                encoding = candidate
+                break
+
+        response = FileResponse(
+            full_path,
+            status_code=status_code,
+            stat_result=stat_result,
+            media_type=media_type,
+        )
+        if encoding:
+            response.headers["content-encoding"] = encoding
+        response.headers["vary"] = "Accept-Encoding"
+        versioned = "v" in QueryParams(scope.get("query_string", b""))
+        response.headers["cache-control"] = (
+            VERSIONED_CACHE_CONTROL if versioned else REVALIDATE_CACHE_CONTROL
+        )
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -13,6 +13,9 @@ from app.config import PERSONALITY_FILE, logger
 # --- Cache de personalidad ---
 _personality_cache: Optional[dict] = None
 _personality_mtime: float = 0.0
+# Parte fija del prompt, derivada del dict de personalidad vigente.
+_base_prompt_cache: Optional[str] = None
+_base_prompt_personality: Optional[dict] = None
 
 _DEFAULT_PERSONALITY: dict = {
     "name": "Agente",
@@ -49,18 +52,8 @@ def load_personality() -> dict:
         return dict(_DEFAULT_PERSONALITY)
 
 
-def build_system_prompt(
-    memory_context: Optional[str] = None,
-    active_reminders: Optional[str] = None
-) -> str:
-    """
-    Construye el system prompt completo combinando:
-    - Personalidad del archivo YAML
-    - Contexto de memoria (si existe)
-    - Recordatorios activos (si existen)
-    """
-    personality = load_personality()
-
+def _build_base_prompt(personality: dict) -> str:
+    """Parte fija del prompt: personalidad y reglas operativas."""
     name = personality.get("name", "Agente")
     tone = personality.get("tone", "amigable")
     language = personality.get("language", "espanol")
@@ -114,6 +107,30 @@ def build_system_prompt(
             "y el titulo de la pelicula; el backend orquesta la comunicacion."
         ),
     ]
+    return "\n".join(prompt_parts)
+
+
+def _get_base_prompt(personality: dict) -> str:
+    """Reutiliza la parte fija mientras load_personality devuelva el mismo dict cacheado."""
+    global _base_prompt_cache, _base_prompt_personality
+
+    if _base_prompt_cache is None or personality is not _base_prompt_personality:
+        _base_prompt_cache = _build_base_prompt(personality)
+        _base_prompt_personality = personality
+    return _base_prompt_cache
+
+
+def build_system_prompt(
+    memory_context: Optional[str] = None,
+    active_reminders: Optional[str] = None
+) -> str:
+    """
+    Construye el system prompt completo combinando:
+    - Personalidad del archivo YAML
+    - Contexto de memoria (si existe)
+    - Recordatorios activos (si existen)
+    """
+    prompt_parts = [_get_base_prompt(load_personality())]
 
     # Inyectar contexto de memoria (Fase 2 lo llenara)
     if memory_context:
@@ -5,6 +5,7 @@ Funciones auxiliares usadas en varios modulos.
 
 import re
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 
 from app.config import logger
@@ -56,6 +57,7 @@ def contains_datetime_reference(text: str) -> bool:
     return False
 
 
+@lru_cache(maxsize=1024)
 def extract_search_intent(text: str) -> Optional[str]:
     """
     Detecta si un mensaje del usuario requiere busqueda web.
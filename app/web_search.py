@@ -4,6 +4,7 @@ Sin API key, resultados de busqueda general y noticias.
 """
 
 import asyncio
+import threading
 from typing import Optional
 
 import httpx
@@ -11,6 +12,14 @@ from duckduckgo_search import DDGS
 
 from app.config import BRAVE_API_KEY, logger
 
+# Pool keep-alive compartido por web y noticias: las busquedas en paralelo reutilizan
+# conexiones TLS a Brave en vez de abrir una nueva por llamada.
+BRAVE_HTTP_LIMITS = httpx.Limits(
+    max_keepalive_connections=8,
+    max_connections=16,
+    keepalive_expiry=60.0,
+)
+
 
 class WebSearchEngine:
     """Busqueda web usando DuckDuckGo (sin API key)."""
@@ -20,6 +29,8 @@ class WebSearchEngine:
         self.brave_web_url = "https://api.search.brave.com/res/v1/web/search"
         self.brave_news_url = "https://api.search.brave.com/res/v1/news/search"
         self._brave_client: Optional[httpx.Client] = None
+        # Las busquedas Brave corren en threads; evita crear dos clientes a la vez.
+        self._brave_client_lock = threading.Lock()
         if self.brave_api_key:
             logger.info("WebSearchEngine inicializado (Brave principal + DuckDuckGo fallback)")
         else:
@@ -27,15 +38,27 @@ class WebSearchEngine:
 
     def _get_brave_client(self) -> httpx.Client:
         """Retorna un cliente HTTP reutilizable para Brave."""
-        if self._brave_client is None or self._brave_client.is_closed:
-            self._brave_client = httpx.Client(
-                timeout=20,
-                headers={
-                    "Accept": "application/json",
-                    "X-Subscription-Token": self.brave_api_key,
-                },
-            )
-        return self._brave_client
+        client = self._brave_client
+        if client is not None and not client.is_closed:
+            return client
+        with self._brave_client_lock:
+            if self._brave_client is None or self._brave_client.is_closed:
+                self._brave_client = httpx.Client(
+                    timeout=20,
+                    headers={
+                        "Accept": "application/json",
+                        "X-Subscription-Token": self.brave_api_key,
+                    },
+                    transport=httpx.HTTPTransport(limits=BRAVE_HTTP_LIMITS, retries=1),
+                )
+            return self._brave_client
+
+    def close(self) -> None:
+        """Cierra el cliente HTTP de Brave (si se creo)."""
+        with self._brave_client_lock:
+            if self._brave_client and not self._brave_client.is_closed:
+                self._brave_client.close()
+            self._brave_client = None
 
     async def search(
         self,
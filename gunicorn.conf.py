@@ -0,0 +1,30 @@
+"""
+Configuracion de Gunicorn para produccion (Linux/macOS).
+
+Uso:
+    pip install gunicorn uvicorn-worker
+    gunicorn app.main:app
+
+Gunicorn lee este archivo automaticamente desde la raiz del proyecto.
+Para desarrollo (o con RELOAD=true) seguir usando `python -m app.main`.
+"""
+
+from app.config import HOST, PORT, TIMEOUT_KEEP_ALIVE, WORKERS
+
+bind = f"{HOST}:{PORT}"
+# Subclase de UvicornWorker que aplica LIMIT_CONCURRENCY (worker_connections no llega a uvicorn).
+worker_class = "app.gunicorn_worker.ShaggyUvicornWorker"
+
+# Cada worker ejecuta su propio lifespan: historial, bot de Telegram y scheduler
+# viven en memoria del proceso. Por eso se respeta WORKERS (default 1) en vez de
+# 2*nucleos+1; subirlo solo es seguro sin Telegram/recordatorios activos.
+workers = WORKERS
+
+# Sin preload: cada worker importa app.main despues del fork, asi OllamaEngine,
+# MemoryManager (Chroma) y los clientes HTTP no comparten sockets ni locks.
+preload_app = False
+
+keepalive = TIMEOUT_KEEP_ALIVE
+# Las respuestas del LLM pueden tardar; el heartbeat del worker no depende de ellas.
+timeout = 60
+graceful_timeout = 30
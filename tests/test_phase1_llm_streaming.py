@@ -0,0 +1,119 @@
+import unittest
+from unittest import mock
+
+import httpx
+
+from app import llm_engine
+from app.llm_engine import OllamaEngine, _strip_think, _ThinkStreamFilter
+
+
+def _feed_all(deltas):
+    think_filter = _ThinkStreamFilter()
+    visible = [think_filter.feed(delta) for delta in deltas]
+    visible.append(think_filter.flush())
+    return "".join(visible)
+
+
+class ThinkStreamFilterTests(unittest.TestCase):
+    def test_tags_split_across_deltas_are_removed(self):
+        deltas = ["Hola <thi", "nk>razonando", " mucho</th", "ink>  mundo"]
+
+        self.assertEqual(_feed_all(deltas), "Hola mundo")
+
+    def test_partial_close_tag_at_delta_boundary(self):
+        think_filter = _ThinkStreamFilter()
+
+        self.assertEqual(think_filter.feed("<think>plan</think"), "")
+        self.assertEqual(think_filter.feed(">Respuesta"), "Respuesta")
+        self.assertEqual(think_filter.flush(), "")
+
+    def test_partial_open_tag_is_released_when_not_a_tag(self):
+        think_filter = _ThinkStreamFilter()
+
+        self.assertEqual(think_filter.feed("a <thi"), "a ")
+        self.assertEqual(think_filter.feed("s b"), "<this b")
+
+    def test_unclosed_block_is_dropped_like_strip_think(self):
+        text = "Respuesta <think>sin cierre"
+
+        self.assertEqual(_feed_all(["Respuesta <th", "ink>sin ", "cierre"]), "Respuesta ")
+        self.assertEqual(_strip_think(text), "Respuesta ")
+
+
+class StripThinkTests(unittest.TestCase):
+    def test_removes_blocks_and_following_whitespace(self):
+        text = "<think>uno</think>\n\nHola <think>dos</think> mundo"
+
+        self.assertEqual(_strip_think(text), "Hola mundo")
+
+    def test_text_without_tags_is_returned_as_is(self):
+        self.assertEqual(_strip_think("sin etiquetas"), "sin etiquetas")
+
+
+class _FlakyStream(httpx.AsyncByteStream):
+    """Emite las lineas indicadas y luego falla con ReadError."""
+
+    def __init__(self, lines):
+        self.lines = lines
+
+    async def __aiter__(self):
+        for line in self.lines:
+            yield line
+        raise httpx.ReadError("conexion cortada")
+
+
+class IterChatChunksRetryTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(llm_engine, "OLLAMA_RETRY_BASE_DELAY", 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.engine = OllamaEngine(base_url="http://ollama.test", model="test-model")
+        self.calls = 0
+
+    async def asyncTearDown(self):
+        await self.engine.close()
+
+    def _use_transport(self, handler):
+        self.engine._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def _collect(self):
+        payload = {"model": "test-model", "messages": []}
+        return [delta async for delta in self.engine._iter_chat_chunks(payload, "none")]
+
+    async def test_connect_error_before_first_delta_is_retried(self):
+        def handler(request):
+            self.calls += 1
+            if self.calls == 1:
+                raise httpx.ConnectError("rechazada", request=request)
+            return httpx.Response(
+                200,
+                content=b'{"message":{"content":"Hola"}}\n{"done":true}\n',
+            )
+
+        self._use_transport(handler)
+
+        self.assertEqual(await self._collect(), ["Hola"])
+        self.assertEqual(self.calls, 2)
+
+    async def test_error_after_first_delta_is_not_retried(self):
+        def handler(request):
+            self.calls += 1
+            return httpx.Response(
+                200,
+                stream=_FlakyStream([b'{"message":{"content":"Hola"}}\n']),
+            )
+
+        self._use_transport(handler)
+
+        received = []
+        with self.assertRaises(httpx.ReadError):
+            payload = {"model": "test-model", "messages": []}
+            async for delta in self.engine._iter_chat_chunks(payload, "none"):
+                received.append(delta)
+
+        self.assertEqual(received, ["Hola"])
+        self.assertEqual(self.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,7 @@
+import os
+import tempfile
 import unittest
+from pathlib import Path
 
 from app.capability_registry import CapabilityRegistry
 from app.product_scope import ProductScope
@@ -19,6 +22,50 @@ class Phase1ScopeRegistryTests(unittest.TestCase):
         self.assertEqual(missing_in_registry, set())
         self.assertIsNotNone(registry.get("web_search_general"))
 
+    def test_registry_reload_reuses_parse_until_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "CAPABILITIES.yaml"
+            path.write_text(
+                "version: 1\n"
+                "updated_at: 2026-01-01\n"
+                "capabilities:\n"
+                "  - id: chat_general\n"
+                "    phase: 1\n"
+                "    provider: llm_engine\n"
+                "    summary: chat\n"
+                "    input_schema: {type: object}\n"
+                "    output_schema: {type: object}\n",
+                encoding="utf-8",
+            )
+            registry = CapabilityRegistry(path=path)
+            first = registry.get("chat_general")
+            registry.reload()
+            self.assertIs(registry.get("chat_general"), first)
+
+            path.write_text(path.read_text(encoding="utf-8").replace("summary: chat", "summary: chat v2"), encoding="utf-8")
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            registry.reload()
+            self.assertEqual(registry.get("chat_general").summary, "chat v2")
+
+    def test_registry_rejects_invalid_phase(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "CAPABILITIES.yaml"
+            path.write_text(
+                "version: 1\n"
+                "updated_at: '2026-01-01'\n"
+                "capabilities:\n"
+                "  - id: chat_general\n"
+                "    phase: 0\n"
+                "    provider: llm_engine\n"
+                "    summary: chat\n"
+                "    input_schema: {type: object}\n"
+                "    output_schema: {type: object}\n",
+                encoding="utf-8",
+            )
+            registry = CapabilityRegistry(path=path)
+            self.assertEqual(registry.all_ids(), [])
+
 
 if __name__ == "__main__":
     unittest.main()
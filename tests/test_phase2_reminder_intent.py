@@ -2,6 +2,7 @@ import unittest
 
 from app.main import (
     _extract_explicit_memory_target,
+    _has_reminder_keyword,
     _looks_like_multi_reminder_request,
     _looks_like_reminder_creation_request,
 )
@@ -63,6 +64,17 @@ class ReminderIntentTests(unittest.TestCase):
             )
         )
 
+    def test_reminder_keyword_prefilter_keeps_actionable_messages(self):
+        for message in (
+            "Recuérdame tomar cafe en 10 minutos",
+            "Que recordatorios tengo activos?",
+            "borra deadbeef",
+            "Avísame mañana a las 8",
+            "/reminders",
+        ):
+            self.assertTrue(_has_reminder_keyword(message.lower()), message)
+        self.assertFalse(_has_reminder_keyword("quiero ver inception"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+
+from app import main as app_main
+from app.config import MAX_CONTEXT_MESSAGES
+
+
+class ConversationHistoryTests(unittest.TestCase):
+    def setUp(self):
+        app_main.conversation_history.pop("history_test_user", None)
+
+    def tearDown(self):
+        app_main.conversation_history.pop("history_test_user", None)
+
+    def test_history_keeps_only_latest_turns(self):
+        turns = app_main.conversation_history["history_test_user"]
+        total = MAX_CONTEXT_MESSAGES + 5
+        for index in range(total):
+            role = "user" if index % 2 == 0 else "assistant"
+            app_main._append_history(turns, role, f"mensaje {index}")
+
+        messages = app_main._history_messages(turns)
+        self.assertEqual(len(messages), MAX_CONTEXT_MESSAGES)
+        self.assertEqual(messages[-1]["content"], f"mensaje {total - 1}")
+        self.assertEqual(messages[0]["content"], f"mensaje {total - MAX_CONTEXT_MESSAGES}")
+        expected_role = "user" if (total - MAX_CONTEXT_MESSAGES) % 2 == 0 else "assistant"
+        self.assertEqual(messages[0]["role"], expected_role)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from app import main as app_main
+
+
+class _CountingEngine:
+    def __init__(self):
+        self.calls = 0
+
+    async def check_health(self):
+        self.calls += 1
+        return True
+
+
+class Phase3HealthCacheTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._original_engine = app_main.llm_engine
+        self._original_radarr = app_main.radarr_client
+        app_main.radarr_client = None
+        app_main.health_cache = None
+
+    def tearDown(self):
+        app_main.llm_engine = self._original_engine
+        app_main.radarr_client = self._original_radarr
+        app_main.health_cache = None
+
+    async def test_repeated_polls_are_served_from_cache(self):
+        engine = _CountingEngine()
+        app_main.llm_engine = engine
+
+        first = await app_main.health()
+        second = await app_main.health()
+
+        self.assertTrue(first.ollama)
+        self.assertIsNone(first.radarr)
+        self.assertEqual(first, second)
+        self.assertEqual(engine.calls, 1)
+
+    async def test_fresh_bypasses_cache(self):
+        engine = _CountingEngine()
+        app_main.llm_engine = engine
+
+        await app_main.health()
+        await app_main.health(fresh=True)
+
+        self.assertEqual(engine.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+from app import main as app_main
+
+
+class FakeWebSearchEngine:
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = []
+
+    async def search(self, query, max_results=5):
+        self.calls.append(("web", query))
+        return list(self.results)
+
+    async def search_news(self, query, max_results=5):
+        self.calls.append(("news", query))
+        return list(self.results)
+
+
+class Phase3WebSearchCacheTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._original_engine = app_main.web_search_engine
+        app_main.web_search_cache.clear()
+
+    def tearDown(self):
+        app_main.web_search_engine = self._original_engine
+        app_main.web_search_cache.clear()
+
+    async def test_repeated_query_is_served_from_cache(self):
+        engine = FakeWebSearchEngine([{"title": "Netflix", "url": "https://netflix.com", "snippet": ""}])
+        app_main.web_search_engine = engine
+
+        first = await app_main._cached_web_search("web_search_general", "Precio Netflix")
+        second = await app_main._cached_web_search("web_search_general", "precio netflix ")
+
+        self.assertEqual(first, second)
+        self.assertEqual(engine.calls, [("web", "Precio Netflix")])
+
+    async def test_force_refresh_and_empty_results_bypass_cache(self):
+        engine = FakeWebSearchEngine([])
+        app_main.web_search_engine = engine
+
+        await app_main._cached_web_search("web_search_news", "noticias chile")
+        await app_main._cached_web_search("web_search_news", "noticias chile")
+        self.assertEqual(len(engine.calls), 2)
+
+        engine.results = [{"title": "Nota", "url": "https://example.com", "snippet": ""}]
+        await app_main._cached_web_search("web_search_news", "noticias chile")
+        await app_main._cached_web_search("web_search_news", "noticias chile", force_refresh=True)
+        self.assertEqual(len(engine.calls), 4)
+
+
+class Phase3WebTextSanitizeTests(unittest.TestCase):
+    def test_entities_are_decoded_only_once(self):
+        text = app_main._sanitize_web_text("Hello <b>world</b> &amp;lt;script&amp;gt; a < b")
+
+        self.assertEqual(text, "Hello world &lt;script&gt; a < b")
+        self.assertEqual(app_main._sanitize_web_text("Tom &amp; Jerry"), "Tom & Jerry")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 
 from app.media_stack import (
+    classify_media_stack_intent,
     looks_like_media_stack_followup_start_request,
     looks_like_media_stack_followup_stop_request,
     looks_like_media_stack_start_request,
@@ -31,6 +32,13 @@ class Phase5MediaStackFollowupTests(unittest.TestCase):
     def test_explicit_scope_start_still_supported(self):
         self.assertTrue(looks_like_media_stack_start_request("activa el protocolo peliculas"))
 
+    def test_classifier_returns_highest_priority_action(self):
+        recent = ["Protocolo peliculas apagado.\nEstado: Radarr:OFF | Jellyfin:OFF"]
+        self.assertEqual(classify_media_stack_intent("/movie_status"), "status")
+        self.assertEqual(classify_media_stack_intent("apaga el protocolo peliculas"), "stop")
+        self.assertEqual(classify_media_stack_intent("activalo", recent), "start")
+        self.assertIsNone(classify_media_stack_intent("quiero ver Inception"))
+
 
 if __name__ == "__main__":
     unittest.main()
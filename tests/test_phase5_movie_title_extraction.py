@@ -0,0 +1,74 @@
+import unittest
+
+from app import main as app_main
+
+
+class _CountingLLM:
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = 0
+
+    async def generate_response(self, messages, system_prompt):
+        self.calls += 1
+        return self.reply
+
+
+class Phase5MovieTitleExtractionTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._original_engine = app_main.llm_engine
+
+    def tearDown(self):
+        app_main.llm_engine = self._original_engine
+
+    async def test_short_direct_request_skips_llm(self):
+        llm = _CountingLLM("Otro titulo")
+        app_main.llm_engine = llm
+
+        title = await app_main._extract_movie_title("Quiero ver Inception")
+
+        self.assertEqual(title, "Inception")
+        self.assertEqual(llm.calls, 0)
+
+    async def test_quoted_title_skips_llm(self):
+        llm = _CountingLLM("Otro titulo")
+        app_main.llm_engine = llm
+
+        title = await app_main._extract_movie_title('ponme la peli "Batman Begins" en la noche por favor')
+
+        self.assertEqual(title, "Batman Begins")
+        self.assertEqual(llm.calls, 0)
+
+    async def test_ambiguous_request_uses_llm(self):
+        llm = _CountingLLM("Batman Begins")
+        app_main.llm_engine = llm
+
+        title = await app_main._extract_movie_title("ponme la peli de Batman Begins")
+
+        self.assertEqual(title, "Batman Begins")
+        self.assertEqual(llm.calls, 1)
+
+    async def test_peli_filler_is_stripped_from_confident_title(self):
+        llm = _CountingLLM("Otro titulo")
+        app_main.llm_engine = llm
+
+        for message, expected in (
+            ("quiero ver la peli de batman", "batman"),
+            ("bajame la peli de Dune", "Dune"),
+            ("descarga la peli Matrix", "Matrix"),
+        ):
+            with self.subTest(message=message):
+                self.assertEqual(await app_main._extract_movie_title(message), expected)
+        self.assertEqual(llm.calls, 0)
+
+    async def test_leading_article_defers_to_llm(self):
+        llm = _CountingLLM("El Padrino")
+        app_main.llm_engine = llm
+
+        title = await app_main._extract_movie_title("quiero ver El Padrino")
+
+        self.assertEqual(title, "El Padrino")
+        self.assertEqual(llm.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
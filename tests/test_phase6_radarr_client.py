@@ -0,0 +1,40 @@
+import unittest
+
+from app.media_handler import RadarrClient
+
+
+class _FakeRadarr(RadarrClient):
+    def __init__(self):
+        super().__init__(base_url="http://radarr.test", api_key="test")
+        self.calls = []
+
+    async def get_root_folders(self):
+        self.calls.append("rootfolder")
+        return [{"path": "/movies"}]
+
+    async def get_quality_profiles(self):
+        self.calls.append("qualityprofile")
+        return [{"id": 4}]
+
+
+class Phase6RadarrClientTests(unittest.IsolatedAsyncioTestCase):
+    async def test_defaults_are_cached_until_invalidated(self):
+        client = _FakeRadarr()
+
+        await client.get_root_folders_cached()
+        await client.get_quality_profiles_cached()
+        folders = await client.get_root_folders_cached()
+        profiles = await client.get_quality_profiles_cached()
+
+        self.assertEqual(folders, [{"path": "/movies"}])
+        self.assertEqual(profiles, [{"id": 4}])
+        self.assertEqual(client.calls, ["rootfolder", "qualityprofile"])
+
+        client.invalidate_defaults_cache()
+        await client.get_root_folders_cached()
+        self.assertEqual(client.calls[-1], "rootfolder")
+        self.assertEqual(len(client.calls), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()